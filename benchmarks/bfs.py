@@ -0,0 +1,44 @@
+#!/usr/bin/env/python3
+"""
+Micro-benchmark of bfs and of Synset hashing/equality, the operations under every dictionary and set of synsets.
+Run from the repository root, e.g. `python benchmarks/bfs.py`, and compare the output between commits.
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wordnet import WordNet  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synsets', default='data/synsets.txt')
+    parser.add_argument('--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('--sample', type=int, default=1000,
+                        help='number of synsets to run bfs from')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    wn = WordNet(args.synsets, args.hypernyms)
+    sample = random.Random(args.seed).sample(list(wn), args.sample)
+
+    seconds = min(timeit.repeat(lambda: [wn.bfs(synset) for synset in sample],
+                                number=1, repeat=5))
+    print('bfs          {:>8.1f} us/call'.format(seconds / len(sample) * 1e6))
+
+    # dictionary probes with equal but not identical keys, as done when results of different calls are combined
+    table = {synset: None for synset in wn}
+    probes = [type(synset)(synset.id, list(synset.lemma), synset.gloss)
+              for synset in sample]
+    seconds = min(timeit.repeat(lambda: [probe in table for probe in probes],
+                                number=20, repeat=5)) / 20
+    print('synset probe {:>8.3f} us/probe'.format(seconds / len(probes) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env/python3
+"""
+Benchmark of the LCA index: build time, memory footprint, load time and query latency of lowest_common_hypernyms and distance
+with and without the index.
+Run from the repository root, e.g. `python benchmarks/lca_index.py`, and compare the output between commits.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wordnet import WordNet  # noqa: E402
+
+
+def query_latency(wn, pairs):
+    """Returns the mean latency in microseconds of lowest_common_hypernyms and of distance over pairs."""
+    latencies = []
+    for method in (wn.lowest_common_hypernyms, wn.distance):
+        start = time.perf_counter()
+        for synset1, synset2 in pairs:
+            method(synset1, synset2)
+        latencies.append((time.perf_counter() - start) / len(pairs) * 1e6)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synsets', default='data/synsets.txt')
+    parser.add_argument('--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('--pairs', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    wn = WordNet(args.synsets, args.hypernyms)
+    rng = random.Random(args.seed)
+    synsets = list(wn)
+    pairs = [(rng.choice(synsets), rng.choice(synsets))
+             for _ in range(args.pairs)]
+
+    print('without index: lch {:.1f} us, distance {:.1f} us'.format(
+        *query_latency(wn, pairs)))
+
+    start = time.perf_counter()
+    wn.build_lca_index()
+    print('build        : {:.2f} s, {:,} bytes'.format(
+        time.perf_counter() - start, wn._indexes['lca'].nbytes))
+    print('with index   : lch {:.1f} us, distance {:.1f} us'.format(
+        *query_latency(wn, pairs)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = os.path.join(tmp, 'lca.idx')
+        wn.save_lca_index(index_file)
+        start = time.perf_counter()
+        wn.load_lca_index(index_file)
+        print('load         : {:.1f} ms'.format(
+            (time.perf_counter() - start) * 1e3))
+
+
+if __name__ == '__main__':
+    main()
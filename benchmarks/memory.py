@@ -0,0 +1,50 @@
+#!/usr/bin/env/python3
+"""
+Memory benchmark: bytes allocated per synset when building a WordNet object.
+Run from the repository root, e.g. `python benchmarks/memory.py`, and compare the output between commits.
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wordnet import WordNet  # noqa: E402
+
+
+def measure(build):
+    """
+    Returns the number of bytes still allocated after build() returned, together with its result.
+    """
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    wn = build()
+    gc.collect()
+    allocated = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return allocated, wn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synsets', default='data/synsets.txt')
+    parser.add_argument('--hypernyms', default='data/hypernyms.txt')
+    args = parser.parse_args()
+
+    variants = [
+        ('default', lambda: WordNet(args.synsets, args.hypernyms)),
+        ('compact', lambda: WordNet(args.synsets, args.hypernyms, compact=True)),
+    ]
+    for name, build in variants:
+        allocated, wn = measure(build)
+        print('{:<8} {:>12,} bytes  {:>8.1f} bytes/synset'.format(
+            name, allocated, allocated / len(wn)))
+        del wn
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env/python3
+"""
+Latency benchmark of noun_lowest_common_hypernyms for polysemous nouns, compared with the previous implementation
+(lowest common hypernyms from root path comparisons, depth of each lch from paths_to_root), which is kept here as legacy_noun_lch.
+Run from the repository root, e.g. `python benchmarks/noun_lch.py`.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wordnet import Lemma, WordNet  # noqa: E402
+
+PAIRS = [('head', 'line'), ('dog', 'horse'), ('bank', 'line'),
+         ('head', 'bank'), ('coffee', 'bread')]
+
+
+def legacy_lowest_common_hypernyms(wn, synset1, synset2):
+    """The path based lowest_common_hypernyms noun_lowest_common_hypernyms was built on before."""
+    paths1 = wn.paths_to_root(synset1)
+    paths2 = wn.paths_to_root(synset2)
+    synsets = []
+    for paths_a, paths_b in ((paths1, paths2), (paths2, paths1)):
+        found = set()
+        for p1 in paths_a:
+            vertices_p1 = p1.vertices
+            tmp = dict()
+            for p2 in paths_b:
+                vertices_p2 = p2.vertices
+                for v1 in vertices_p1:
+                    if v1 in vertices_p2:
+                        tmp[v1] = vertices_p1.index(v1)
+                        break
+            if tmp:
+                found.add(min(tmp, key=tmp.get))
+        synsets.append(found)
+    return synsets[0] & synsets[1]
+
+
+def legacy_noun_lch(wn, noun1, noun2):
+    dist2lch = dict()
+    for s1 in wn.get_synsets(noun1):
+        for s2 in wn.get_synsets(noun2):
+            for lch in legacy_lowest_common_hypernyms(wn, s1, s2):
+                for path_to_root in wn.paths_to_root(lch):
+                    dist2lch.setdefault(len(path_to_root), []).append(lch)
+    return set(dist2lch[max(dist2lch)]) if dist2lch else set()
+
+
+def latency(function, repeat):
+    """Returns the best of repeat runs of function(), in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = (time.perf_counter() - start) * 1e3
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synsets', default='data/synsets.txt')
+    parser.add_argument('--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('--pair', nargs=2, action='append', metavar=('NOUN1', 'NOUN2'),
+                        help='noun pair to benchmark (repeatable), default: {}'.format(PAIRS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--target-ms', type=float, default=10.0,
+                        help='latency target per call, pairs above it are flagged')
+    parser.add_argument('--no-legacy', action='store_true',
+                        help='do not time the previous implementation')
+    args = parser.parse_args()
+
+    wn = WordNet(args.synsets, args.hypernyms)
+    missed = 0
+    for noun1, noun2 in args.pair or PAIRS:
+        if Lemma(noun1) not in wn.lemmasDict or Lemma(noun2) not in wn.lemmasDict:
+            print('{}/{}: skipped, not in WordNet'.format(noun1, noun2))
+            continue
+        senses = '{}x{} senses'.format(len(wn.get_synsets(noun1)), len(wn.get_synsets(noun2)))
+        current = latency(
+            lambda: wn.noun_lowest_common_hypernyms(noun1, noun2), args.repeat)
+        line = '{}/{} ({}): {:.2f} ms'.format(noun1, noun2, senses, current)
+        if not args.no_legacy:
+            legacy = latency(lambda: legacy_noun_lch(wn, noun1, noun2), 1)
+            line += ', legacy {:.2f} ms ({:.0f}x)'.format(legacy, legacy / current)
+        if current > args.target_ms:
+            missed += 1
+            line += '  ABOVE TARGET'
+        print(line)
+    sys.exit(1 if missed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env/python3
+"""
+Benchmark suite of the WordNet hot paths: loading, lookups, traversals and similarity.
+Results are written as JSON so that runs of different commits can be compared, e.g.
+
+    python benchmarks/suite.py --output before.json
+    git checkout <other commit>
+    python benchmarks/suite.py --output after.json --compare before.json
+
+Samples are drawn with a fixed seed, so every run measures the same synsets, lemmas and pairs.
+Benchmarks of features missing in the checked out commit (e.g. compact mode or snapshots) are skipped and listed under "skipped".
+"""
+
+import argparse
+import gc
+import inspect
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wordnet import WordNet  # noqa: E402
+
+
+def percentiles(samples):
+    """Returns the p50, p90, p99 and max of a list of latencies (seconds) in microseconds."""
+    samples = sorted(samples)
+
+    def at(q):
+        return samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6
+
+    return {'p50_us': at(0.50), 'p90_us': at(0.90), 'p99_us': at(0.99), 'max_us': samples[-1] * 1e6}
+
+
+def latencies(function, arguments):
+    """Call function(*args) for every args in arguments, returns the latency percentiles."""
+    samples = []
+    for args in arguments:
+        start = time.perf_counter()
+        function(*args)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def throughput(function, arguments):
+    """Call function(*args) for every args in arguments, returns the calls per second."""
+    start = time.perf_counter()
+    for args in arguments:
+        function(*args)
+    return {'ops_per_s': len(arguments) / (time.perf_counter() - start)}
+
+
+def load(build):
+    """Time build() and measure the memory it allocates (peak and still allocated afterwards)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    wn = build()
+    seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # timing without tracemalloc overhead
+    gc.collect()
+    start = time.perf_counter()
+    wn = build()
+    return wn, {'seconds': time.perf_counter() - start, 'seconds_traced': seconds,
+                'retained_bytes': retained, 'peak_bytes': peak}
+
+
+def missing_features():
+    """Returns benchmark name : reason for the benchmarks the WordNet class of this commit cannot run."""
+    missing = dict()
+    if 'compact' not in inspect.signature(WordNet.__init__).parameters:
+        missing['load_compact'] = 'WordNet has no compact mode'
+    if not (hasattr(WordNet, 'save_snapshot') and hasattr(WordNet, 'from_snapshot')):
+        missing['load_snapshot'] = 'WordNet has no snapshots'
+    return missing
+
+
+def run(args, skipped):
+    results = dict()
+    rng = random.Random(args.seed)
+
+    wn, results['load'] = load(lambda: WordNet(args.synsets, args.hypernyms))
+    if 'load_compact' not in skipped:
+        _, results['load_compact'] = load(
+            lambda: WordNet(args.synsets, args.hypernyms, compact=True))
+    if 'load_snapshot' not in skipped:
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = os.path.join(tmp, 'wordnet.snap')
+            wn.save_snapshot(snapshot_file)
+            _, results['load_snapshot'] = load(
+                lambda: WordNet.from_snapshot(snapshot_file))
+
+    synsets = list(wn)
+    sample = rng.sample(synsets, min(args.sample, len(synsets)))
+    pairs = [(rng.choice(synsets), rng.choice(synsets))
+             for _ in range(args.pairs)]
+    lemmas = [lemma.lemma for lemma in rng.sample(
+        list(wn.lemmasDict), min(args.sample, len(wn.lemmasDict)))]
+
+    results['get_synsets'] = throughput(wn.get_synsets, [(lemma,) for lemma in lemmas])
+    results['bfs'] = latencies(wn.bfs, [(synset,) for synset in sample])
+    results['paths_to_root'] = latencies(
+        wn.paths_to_root, [(synset,) for synset in sample])
+    results['lowest_common_hypernyms'] = throughput(
+        wn.lowest_common_hypernyms, pairs)
+    results['distance'] = throughput(wn.distance, pairs)
+    # build the depth index up front, its cost is part of str below
+    wn.depth_wordnet()
+    results['lch_similarity'] = throughput(wn.lch_similarity, pairs)
+
+    fresh = WordNet(args.synsets, args.hypernyms)
+    start = time.perf_counter()
+    str(fresh)
+    results['str'] = {'seconds': time.perf_counter() - start}
+    return results
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'seed': args.seed, 'sample': args.sample, 'pairs': args.pairs}
+
+
+def compare(results, baseline):
+    """Print every metric next to the baseline value and the ratio (current / baseline), benchmarks missing in either run are listed."""
+    for benchmark in sorted(set(results) ^ set(baseline)):
+        print('{:<28} only in the {} run'.format(
+            benchmark, 'current' if benchmark in results else 'baseline'))
+    for benchmark, metrics in results.items():
+        for metric, value in metrics.items():
+            old = baseline.get(benchmark, {}).get(metric)
+            if not old:
+                continue
+            print('{:<28} {:<16} {:>14.2f} {:>14.2f} {:>8.2f}x'.format(
+                benchmark, metric, old, value, value / old))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--synsets', default=os.path.join(ROOT, 'data', 'synsets.txt'))
+    parser.add_argument('--hypernyms', default=os.path.join(ROOT, 'data', 'hypernyms.txt'))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sample', type=int, default=2000,
+                        help='number of synsets (and lemmas) in the traversal and lookup samples')
+    parser.add_argument('--pairs', type=int, default=2000,
+                        help='number of synset pairs in the similarity samples')
+    parser.add_argument('--output', help='JSON file to write, default: stdout')
+    parser.add_argument('--compare', metavar='JSON',
+                        help='results of an earlier run to compare with')
+    args = parser.parse_args()
+
+    skipped = missing_features()
+    report = {'meta': metadata(args), 'results': run(args, skipped), 'skipped': skipped}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f_output:
+            f_output.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f_baseline:
+            compare(report['results'], json.load(f_baseline)['results'])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,24 @@
 #!/usr/bin/env/python3
 
+import gc
+import importlib.util
+import os
+import sys
+import tempfile
 import unittest
+from unittest import mock
 
-from wordnet import WordNet
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import multiprocessing
+
+from wordnet import WordNet, load_hypernym_closure
+
+HAS_SCIPY = importlib.util.find_spec("scipy") is not None
+
+
+def attached_distance(name, id1, id2):
+    wn = WordNet.attach_shared_memory(name)
+    return wn.distance(wn.verticesDict[id1], wn.verticesDict[id2])
 
 
 class TestWordNet(unittest.TestCase):
@@ -94,3 +110,595 @@ class TestWordNet(unittest.TestCase):
         # [61107] placental placental_mammal eutherian eutherian_mammal: mammals having a placenta; all mammals except monotremes and marsupials
         self.assertEqual(len(lowest_common_hypernyms), 1)
         self.assertEqual(next(iter(lowest_common_hypernyms)).index, 61107)
+
+        self.assertEqual(self.wn.noun_lowest_common_hypernyms("dog", "not_a_wordnet_lemma"), set())
+        self.assertEqual(self.wn.noun_lowest_common_hypernyms("not_a_wordnet_lemma", "dog"), set())
+
+        # two hierarchies without a common root
+        with tempfile.TemporaryDirectory() as tmp:
+            synsets_file = os.path.join(tmp, "synsets.txt")
+            hypernyms_file = os.path.join(tmp, "hypernyms.txt")
+            with open(synsets_file, 'w', encoding='utf-8') as f:
+                f.write("0,entity,a root\n1,dog,a dog\n2,thing,another root\n3,rock,a rock\n")
+            with open(hypernyms_file, 'w', encoding='utf-8') as f:
+                f.write("1,0\n3,2\n")
+            wn = WordNet(synsets_file, hypernyms_file)
+        self.assertEqual(wn.noun_lowest_common_hypernyms("dog", "rock"), set())
+        self.assertEqual({syn.id for syn in wn.noun_lowest_common_hypernyms("dog", "entity")}, {"0"})
+
+    def test_snapshot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = os.path.join(tmp, "wordnet.snap")
+            self.wn.save_snapshot(snapshot_file)
+            wn = WordNet.from_snapshot(snapshot_file)
+
+            self.assertEqual(len(wn), 82115)
+            self.assertEqual(len(wn.edgesdict), len(self.wn.edgesdict))
+            self.assertEqual([syn.id for syn in wn.get_synsets("bank")],
+                             [syn.id for syn in self.wn.get_synsets("bank")])
+
+            domestic_dog = next(
+                syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+            self.assertEqual(domestic_dog.gloss, self.wn.verticesDict[domestic_dog.id].gloss)
+            self.assertEqual(len(wn.paths_to_root(domestic_dog)), 2)
+
+    def test_depth_index(self):
+        self.assertEqual(self.wn.depth_wordnet(), 19)
+
+        dog_synsets = self.wn.get_synsets("dog")
+        domestic_dog = next(
+            syn for syn in dog_synsets if "domestic_dog" in syn.name)
+
+        self.assertEqual(self.wn.min_depth(domestic_dog), 8)
+        self.assertEqual(self.wn.max_depth(domestic_dog), 13)
+
+        # every synset has a shortcut to the root: the overall depth is the bfs distance from 1 to 4, not a distance to the root
+        with tempfile.TemporaryDirectory() as tmp:
+            synsets_file = os.path.join(tmp, "synsets.txt")
+            hypernyms_file = os.path.join(tmp, "hypernyms.txt")
+            with open(synsets_file, 'w', encoding='utf-8') as f:
+                f.write("".join("{0},s{0},gloss {0}\n".format(i) for i in range(5)))
+            with open(hypernyms_file, 'w', encoding='utf-8') as f:
+                f.write("1,0,2\n2,0,3\n3,0,4\n4,0\n")
+            wn = WordNet(synsets_file, hypernyms_file)
+        self.assertEqual(max(wn.min_depth(synset) for synset in wn), 1)
+        self.assertEqual(wn.depth_wordnet(), 4)
+
+    def test_lowest_common_hypernym_of_hypernym(self):
+        dog_synsets = self.wn.get_synsets("dog")
+        domestic_dog = next(
+            syn for syn in dog_synsets if "domestic_dog" in syn.name)
+
+        # [27181] canine canid: a hypernym of domestic_dog
+        canine = self.wn.verticesDict['27181']
+
+        hyp = self.wn.lowest_common_hypernyms(domestic_dog, canine)
+        self.assertEqual(hyp, {canine})
+        self.assertEqual(self.wn.distance(domestic_dog, canine), 1)
+        self.assertEqual(self.wn.distance(domestic_dog, domestic_dog), 0)
+
+    def test_iter_paths_to_root(self):
+        dog_synsets = self.wn.get_synsets("dog")
+        domestic_dog = next(
+            syn for syn in dog_synsets if "domestic_dog" in syn.name)
+
+        paths = list(self.wn.iter_paths_to_root(domestic_dog))
+        self.assertEqual(sorted(len(path) for path in paths), [8, 13])
+        for path in paths:
+            self.assertEqual(path.vertices[0], domestic_dog)
+            self.assertEqual(path.vertices[-1].index, 37987)
+
+        self.assertEqual(
+            len(list(self.wn.iter_paths_to_root(domestic_dog, max_paths=1))), 1)
+        self.assertEqual(
+            [len(path) for path in self.wn.iter_paths_to_root(domestic_dog, max_depth=10)], [8])
+        self.assertEqual(
+            [len(path) for path in self.wn.iter_paths_to_root(domestic_dog, max_depth=8)], [8])
+
+        root = self.wn.verticesDict["37987"]
+        child = self.wn.hyponyms(root)[0]
+        self.assertEqual(list(self.wn.iter_paths_to_root(child, max_depth=0)), [])
+        self.assertEqual(
+            [len(path) for path in self.wn.iter_paths_to_root(child, max_depth=1)], [1])
+        self.assertEqual(
+            [len(path) for path in self.wn.iter_paths_to_root(root, max_depth=0)], [0])
+
+    def test_similarity_many(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in self.wn.get_synsets("cat") if "true_cat" in syn.name)
+        bank_synsets = self.wn.get_synsets("bank")
+
+        pairs = [(domestic_dog, domestic_cat)] + \
+            [(domestic_dog, bank) for bank in bank_synsets]
+        self.assertEqual(self.wn.distance_many(pairs),
+                         [self.wn.distance(s1, s2) for s1, s2 in pairs])
+
+        similarities = self.wn.lch_similarity_many(pairs)
+        self.assertAlmostEqual(similarities[0], 2.028148247)
+        for (s1, s2), similarity in zip(pairs, similarities):
+            self.assertAlmostEqual(similarity, self.wn.lch_similarity(s1, s2))
+
+    def test_bfs_cache(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt", cache_size=2)
+        self.assertIsNone(self.wn.cache_info())
+
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in wn.get_synsets("cat") if "true_cat" in syn.name)
+        bank = wn.get_synsets("bank")[0]
+
+        discovered = {syn.id: distance for syn, (_, distance) in wn.bfs(domestic_dog).items()}
+        expected = {syn.id: distance for syn, (_, distance) in self.wn.bfs(
+            self.wn.verticesDict[domestic_dog.id]).items()}
+        self.assertEqual(discovered, expected)
+        self.assertEqual(wn.distance(domestic_dog, domestic_cat), 4)
+        wn.bfs(bank)
+        info = wn.cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['evictions'], info['size']),
+                         (1, 3, 1, 2))
+
+        # a hit returns a copy of the cached dictionary
+        first = wn.bfs(bank)
+        first.clear()
+        self.assertEqual(wn.bfs(bank), self.wn.bfs(self.wn.verticesDict[bank.id]))
+        self.assertEqual(wn.cache_info()['hits'], 3)
+
+        wn.cache_clear()
+        self.assertEqual(wn.cache_info()['size'], 0)
+
+    def test_compact(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt", compact=True)
+        self.assertEqual(len(wn.edgesdict), len(self.wn.edgesdict))
+
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in wn.get_synsets("cat") if "true_cat" in syn.name)
+
+        self.assertEqual(len(wn.paths_to_root(domestic_dog)), 2)
+        hyp = wn.lowest_common_hypernyms(domestic_dog, domestic_cat)
+        self.assertEqual([syn.index for syn in hyp], [27618])
+        self.assertEqual(wn.distance(domestic_dog, domestic_cat), 4)
+
+        discovered = wn.bfs(domestic_dog)
+        canine = wn.verticesDict['27181']
+        relation, distance = discovered[canine]
+        self.assertEqual(distance, 1)
+        self.assertEqual(relation.endpoints(), (domestic_dog, canine))
+
+    def test_compact_objects(self):
+        dog_synsets = self.wn.get_synsets("dog")
+        domestic_dog = next(
+            syn for syn in dog_synsets if "domestic_dog" in syn.name)
+        self.assertFalse(hasattr(domestic_dog, '__dict__'))
+        self.assertEqual(domestic_dog.name, ["dog", "domestic_dog", "Canis_familiaris"])
+
+        # all synsets share the Lemma object of "dog"
+        dog_lemmas = {id(lemma) for syn in dog_synsets for lemma in syn if lemma.lemma == "dog"}
+        self.assertEqual(len(dog_lemmas), 1)
+
+    def test_synset_equality(self):
+        domestic_dog = self.wn.verticesDict['35930']
+        copy = type(domestic_dog)(
+            domestic_dog.id, list(domestic_dog.lemma), domestic_dog.gloss)
+
+        self.assertEqual(copy, domestic_dog)
+        self.assertEqual(hash(copy), hash(domestic_dog))
+        self.assertNotEqual(self.wn.verticesDict['27181'], domestic_dog)
+
+    def test_malformed_lines(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            synsets_file = os.path.join(tmp, "synsets.txt")
+            hypernyms_file = os.path.join(tmp, "hypernyms.txt")
+            with open(synsets_file, 'w', encoding='utf-8') as f:
+                f.write("0,entity,that which is perceived or known, or inferred\n"
+                        "1,dog domestic_dog,a member of the genus Canis\n"
+                        "not a synset\n"
+                        "2,cat,a feline mammal\n")
+            with open(hypernyms_file, 'w', encoding='utf-8') as f:
+                f.write("1,0\n2,0\n2,42\n1,2\n")
+
+            with self.assertWarns(UserWarning):
+                wn = WordNet(synsets_file, hypernyms_file, trace_memory=True)
+            with self.assertWarns(UserWarning):
+                compact = WordNet(synsets_file, hypernyms_file, compact=True)
+
+        self.assertEqual(len(wn), 3)
+        self.assertEqual(wn.verticesDict['0'].gloss,
+                         "that which is perceived or known, or inferred\n")
+        self.assertEqual(wn.distance(wn.get_synsets("dog")[0], wn.get_synsets("cat")[0]), 2)
+
+        stats = wn.load_stats
+        self.assertEqual(stats['synsets'], 3)
+        self.assertEqual(stats['relations'], 2)
+        self.assertEqual([line for _, line in stats['malformed_lines']], [3, 3, 4])
+        self.assertEqual(compact.load_stats['malformed_lines'], stats['malformed_lines'])
+        self.assertEqual(compact.distance(compact.get_synsets("dog")[0], compact.get_synsets("cat")[0]), 2)
+        self.assertGreater(stats['peak_memory'], 0)
+
+    def test_similarity_matrix(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in self.wn.get_synsets("cat") if "true_cat" in syn.name)
+        synsets = [domestic_dog, domestic_cat] + self.wn.get_synsets("bank")[:3]
+
+        matrix = self.wn.similarity_matrix(synsets, workers=2, block_size=2)
+        self.assertEqual(len(matrix), 5)
+        for s1, row in zip(synsets, matrix):
+            for s2, similarity in zip(synsets, row):
+                self.assertAlmostEqual(similarity, self.wn.lch_similarity(s1, s2))
+
+        neighbours = self.wn.similarity_matrix(
+            synsets, metric='distance', top_k=1, workers=1)
+        self.assertEqual(neighbours[0], [(1, 4.0)])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            out = self.wn.similarity_matrix(
+                synsets, workers=2, block_size=2, out=os.path.join(tmp, "matrix.bin"))
+            self.assertEqual(out[0, 1], matrix[0][1])
+            out.release()
+
+        # concurrent in-process calls do not share state
+        inputs = [synsets, list(reversed(synsets)), synsets[:3], synsets[2:]]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(
+                lambda syns: self.wn.similarity_matrix(syns, metric='distance', workers=1, block_size=1), inputs * 5))
+        for syns, result in zip(inputs * 5, results):
+            self.assertEqual([list(row) for row in result],
+                             [[float(self.wn.distance(s1, s2)) for s2 in syns] for s1 in syns])
+
+    def test_lca_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = os.path.join(tmp, "wordnet.snap")
+            index_file = os.path.join(tmp, "lca.idx")
+            self.wn.save_snapshot(snapshot_file)
+            wn = WordNet.from_snapshot(snapshot_file)
+            wn.save_lca_index(index_file)
+
+            wn = WordNet.from_snapshot(snapshot_file)
+            wn.load_lca_index(index_file)
+
+            domestic_dog = next(
+                syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+            domestic_cat = next(
+                syn for syn in wn.get_synsets("cat") if "true_cat" in syn.name)
+            hyp = wn.lowest_common_hypernyms(domestic_dog, domestic_cat)
+            self.assertEqual([syn.index for syn in hyp], [27618])
+            self.assertEqual(wn.distance(domestic_dog, domestic_cat), 4)
+
+            for syn in wn.get_synsets("bank"):
+                self.assertEqual(wn.distance(domestic_dog, syn),
+                                 self.wn.distance(self.wn.verticesDict[domestic_dog.id],
+                                                  self.wn.verticesDict[syn.id]))
+
+    def test_profiling(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt")
+        self.assertIsNone(wn.profile_stats())
+        wn.enable_profiling()
+
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        self.assertEqual(len(wn.paths_to_root(domestic_dog)), 2)
+        discovered = wn.bfs(domestic_dog)
+
+        stats = wn.profile_stats()
+        self.assertEqual(stats['methods']['get_synsets']['calls'], 1)
+        self.assertEqual(stats['methods']['paths_to_root']['calls'], 1)
+        # internal calls are part of the outer call
+        self.assertNotIn('iter_paths_to_root', stats['methods'])
+        self.assertEqual(stats['methods']['bfs']['calls'], 1)
+        self.assertEqual(stats['counters'], {
+                         'bfs_nodes_visited': len(discovered), 'paths_enumerated': 2})
+        self.assertEqual(stats['methods']['paths_to_root']['counters']['paths_enumerated'], 2)
+        self.assertEqual(stats['methods']['bfs']['counters'], {
+                         'bfs_nodes_visited': len(discovered), 'paths_enumerated': 0})
+        self.assertLessEqual(stats['methods']['bfs']['p50'],
+                             stats['methods']['bfs']['max'])
+        self.assertIn('wordnet_method_seconds_count{method="bfs"} 1',
+                      wn.profile_prometheus())
+        self.assertIn('wordnet_paths_enumerated_total 2',
+                      wn.profile_prometheus())
+        self.assertIn('wordnet_method_paths_enumerated_total{method="paths_to_root"} 2',
+                      wn.profile_prometheus())
+
+        wn.hyponyms(domestic_dog)
+        self.assertEqual(len(list(wn.iter_paths_to_root(domestic_dog))), 2)
+        for _ in range(3):
+            wn.lch_similarity(domestic_dog, wn.get_synsets("cat")[0])
+        stats = wn.profile_stats()
+        self.assertEqual(stats['methods']['hyponyms']['calls'], 1)
+        self.assertEqual(stats['methods']['iter_paths_to_root']['calls'], 1)
+        self.assertEqual(stats['methods']['iter_paths_to_root']['counters']['paths_enumerated'], 2)
+        self.assertEqual(stats['methods']['lch_similarity']['calls'], 3)
+        self.assertNotIn('depth_wordnet', stats['methods'])
+
+        wn.profile_reset()
+        self.assertEqual(wn.profile_stats()['methods'], {})
+        self.assertEqual(wn.disable_profiling()['counters']['paths_enumerated'], 0)
+        self.assertNotIn('bfs', vars(wn))
+        self.assertIsNone(wn.profile_stats())
+
+    def test_lemma_index(self):
+        self.assertEqual(self.wn.get_synsets("not_a_wordnet_lemma"), [])
+        self.assertEqual(self.wn.lookup("not a wordnet lemma"), [])
+
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        self.assertEqual(self.wn.lookup("Domestic Dog"), [domestic_dog])
+        self.assertEqual(self.wn.lookup("BANK"), self.wn.get_synsets("bank"))
+
+        completions = self.wn.complete("Domestic_")
+        self.assertIn("domestic_dog", completions)
+        self.assertTrue(all(lemma.lower().startswith("domestic_")
+                        for lemma in completions))
+        self.assertEqual(len(self.wn.complete("dog", limit=1)), 1)
+
+        self.assertIn(("domestic_dog", 1), self.wn.suggest("Domestic dob", 1))
+        suggestions = self.wn.suggest("dgo", 2)
+        self.assertIn(("dog", 2), suggestions)
+        self.assertEqual([distance for _, distance in suggestions],
+                         sorted(distance for _, distance in suggestions))
+
+    def test_get_synsets_many(self):
+        tokens = ["dog", "bank", "not_a_wordnet_lemma", "dog"]
+        synsets = self.wn.get_synsets_many(tokens)
+        self.assertEqual(list(synsets), ["dog", "bank", "not_a_wordnet_lemma"])
+        self.assertEqual(synsets["bank"], tuple(self.wn.get_synsets("bank")))
+        self.assertEqual(synsets["not_a_wordnet_lemma"], ())
+
+        indexes = self.wn.get_synsets_many(tokens, indexes=True)
+        self.assertEqual(indexes["dog"], tuple(syn.index for syn in synsets["dog"]))
+        self.assertEqual(list(self.wn.iter_synsets(iter(tokens))),
+                         [(token, synsets[token]) for token in tokens])
+
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = os.path.join(tmp, "wordnet.snap")
+            self.wn.save_snapshot(snapshot_file)
+            wn = WordNet.from_snapshot(snapshot_file)
+            self.assertEqual(wn.get_synsets_many(tokens, indexes=True), indexes)
+            self.assertEqual([(token, tuple(syn.id for syn in syns))
+                              for token, syns in wn.iter_synsets(tokens, memo_size=2)],
+                             [(token, tuple(syn.id for syn in synsets[token])) for token in tokens])
+
+    def test_hyponyms(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        canine = self.wn.verticesDict["27181"]
+        root = self.wn.verticesDict["37987"]
+
+        for relation in self.wn.edgesdict[domestic_dog.id]:
+            self.assertIn(domestic_dog, self.wn.hyponyms(relation.destination))
+        self.assertIn(domestic_dog, self.wn.descendants(canine))
+        self.assertTrue(self.wn.is_descendant(domestic_dog, canine))
+        self.assertFalse(self.wn.is_descendant(canine, domestic_dog))
+        self.assertFalse(self.wn.is_descendant(canine, canine))
+
+        self.assertEqual(self.wn.subtree_size(canine),
+                         len(self.wn.descendants(canine)) + 1)
+        self.assertEqual(self.wn.subtree_size(root), 82115)
+        self.assertEqual(len(self.wn.descendants(root)), 82114)
+
+        leaves = self.wn.leaves()
+        self.assertTrue(leaves)
+        self.assertTrue(all(self.wn.is_leaf(syn) and self.wn.subtree_size(syn) == 1
+                            for syn in leaves))
+        self.assertFalse(self.wn.is_leaf(canine))
+
+    def test_information_content(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt")
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in wn.get_synsets("cat") if "true_cat" in syn.name)
+        carnivore = wn.verticesDict["27618"]
+        root = wn.verticesDict["37987"]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            frequency_file = os.path.join(tmp, "frequencies.txt")
+            with open(frequency_file, "w") as f_frequencies:
+                f_frequencies.write("dog,120\ncat,80\nbank,30\nnot_a_wordnet_lemma,7\nno count\n")
+            with self.assertWarns(UserWarning):
+                wn.load_frequencies(frequency_file, smoothing=1.0)
+
+            self.assertAlmostEqual(wn.information_content(root), 0.0)
+            self.assertGreater(wn.information_content(domestic_dog),
+                               wn.information_content(carnivore))
+            self.assertAlmostEqual(wn.resnik_similarity(domestic_dog, domestic_cat),
+                                   wn.information_content(carnivore))
+            lin = wn.lin_similarity(domestic_dog, domestic_cat)
+            self.assertTrue(0 < lin < 1)
+            self.assertAlmostEqual(wn.lin_similarity(domestic_dog, domestic_dog), 1.0)
+            self.assertEqual(wn.jcn_similarity(domestic_dog, domestic_dog), float("inf"))
+
+            matrix = wn.similarity_matrix([domestic_dog, domestic_cat], metric="jcn", workers=1)
+            self.assertAlmostEqual(matrix[0][1], wn.jcn_similarity(domestic_dog, domestic_cat))
+
+            ic_file = os.path.join(tmp, "wordnet.ic")
+            wn.save_ic(ic_file)
+            loaded = WordNet("data/synsets.txt", "data/hypernyms.txt")
+            loaded.load_ic(ic_file)
+            self.assertAlmostEqual(loaded.lin_similarity(
+                loaded.verticesDict[domestic_dog.id], loaded.verticesDict[domestic_cat.id]), lin)
+
+    def test_shortest_paths_to_root(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        self.assertEqual(self.wn.count_paths_to_root(domestic_dog), 2)
+        self.assertEqual(self.wn.count_paths_to_root(self.wn.verticesDict["37987"]), 1)
+
+        paths = list(self.wn.iter_shortest_paths_to_root(domestic_dog))
+        self.assertEqual([len(path) for path in paths], [8, 13])
+        self.assertEqual(sorted([syn.id for syn in path.vertices] for path in paths),
+                         sorted([syn.id for syn in path.vertices]
+                                for path in self.wn.paths_to_root(domestic_dog)))
+        shortest = next(self.wn.iter_shortest_paths_to_root(domestic_dog, k=1))
+        self.assertEqual(len(shortest), self.wn.min_depth(domestic_dog))
+        self.assertEqual(len(list(self.wn.iter_shortest_paths_to_root(domestic_dog, k=1))), 1)
+
+    def test_incremental_updates(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            snapshot_file = os.path.join(tmp, "wordnet.snap")
+            self.wn.save_snapshot(snapshot_file)
+            for wn in (WordNet("data/synsets.txt", "data/hypernyms.txt", cache_size=100),
+                       WordNet.from_snapshot(snapshot_file, cache_size=100)):
+                domestic_dog = next(
+                    syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+                domestic_cat = next(
+                    syn for syn in wn.get_synsets("cat") if "true_cat" in syn.name)
+                self.assertEqual(wn.depth_wordnet(), 19)
+                wn.bfs(domestic_dog)
+
+                robot_dog = wn.add_synset("90000", ["robot_dog", "dog"], "a robot dog")
+                self.assertEqual(len(wn), 82116)
+                self.assertIn(robot_dog, wn.get_synsets("dog"))
+                self.assertEqual(wn.lookup("Robot Dog"), [robot_dog])
+                self.assertRaises(ValueError, wn.add_synset, "90000", ["robot_dog"])
+
+                wn.add_hypernym(robot_dog, domestic_dog)
+                self.assertEqual(wn.distance(robot_dog, domestic_cat), 5)
+                self.assertEqual(wn.count_paths_to_root(robot_dog), 2)
+                self.assertIn(robot_dog, wn.hyponyms(domestic_dog))
+                self.assertRaises(ValueError, wn.add_hypernym, domestic_dog, robot_dog)
+
+                hypernym = wn.edgesdict[domestic_dog.id][0].destination
+                wn.remove_hypernym(domestic_dog, hypernym)
+                self.assertNotIn(hypernym, wn.bfs(domestic_dog))
+                self.assertEqual(len(wn.paths_to_root(robot_dog)), 1)
+                self.assertRaises(ValueError, wn.remove_hypernym, domestic_dog, hypernym)
+                wn.add_hypernym(domestic_dog, hypernym)
+                self.assertEqual(wn.count_paths_to_root(robot_dog), 2)
+                self.assertEqual(len(wn.edgesdict), len(self.wn.edgesdict) + 1)
+
+    def test_add_synset_keeps_indexes(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt")
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        with tempfile.TemporaryDirectory() as tmp:
+            frequency_file = os.path.join(tmp, "frequencies.txt")
+            with open(frequency_file, "w") as f_frequencies:
+                f_frequencies.write("dog,120\ncat,80\n")
+            wn.load_frequencies(frequency_file)
+            ic_file = os.path.join(tmp, "wordnet.ic")
+            wn.save_ic(ic_file)
+            wn.load_ic(ic_file)
+        dog_ic = wn.information_content(domestic_dog)
+        self.assertEqual(wn.count_paths_to_root(domestic_dog), 2)
+        self.assertEqual(wn.depth_wordnet(), 19)
+        dog_subtree = wn.subtree_size(domestic_dog)
+
+        # a new synset has no relations, the indexes built so far are extended instead of dropped
+        robot = wn.add_synset("90005", ["robot"], "a machine")
+        self.assertEqual(wn.information_content(domestic_dog), dog_ic)
+        self.assertEqual(wn.information_content(robot), float("inf"))
+        self.assertEqual((wn.min_depth(robot), wn.max_depth(robot)), (0, 0))
+        self.assertEqual(wn.count_paths_to_root(robot), 1)
+        self.assertEqual(wn.subtree_size(robot), 1)
+        self.assertEqual(wn.subtree_size(domestic_dog), dog_subtree)
+        self.assertFalse(wn.is_descendant(robot, domestic_dog))
+        self.assertEqual(wn.depth_wordnet(), 19)
+        self.assertIsNone(wn.distance(robot, domestic_dog))
+        self.assertEqual(wn.statistics()['synsets'], 82116)
+
+        wn.add_hypernym(robot, domestic_dog)
+        self.assertEqual(wn.count_paths_to_root(robot), 2)
+        self.assertEqual(wn.min_depth(robot), 9)
+        self.assertEqual(wn.distance(robot, domestic_dog), 1)
+        self.assertEqual(wn.subtree_size(domestic_dog), dog_subtree + 1)
+
+    def test_similarity_without_common_hypernym(self):
+        wn = WordNet("data/synsets.txt", "data/hypernyms.txt")
+        domestic_dog = next(
+            syn for syn in wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        island = wn.add_synset("95000", ["island_synset"], "a synset without hypernyms")
+        self.assertIsNone(wn.distance(island, domestic_dog))
+        self.assertIsNone(wn.lch_similarity(island, domestic_dog))
+        self.assertEqual(wn.lch_similarity_many([(island, domestic_dog)]), [None])
+
+    def test_shared_memory(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        domestic_cat = next(
+            syn for syn in self.wn.get_synsets("cat") if "true_cat" in syn.name)
+        block = self.wn.to_shared_memory()
+        try:
+            wn = WordNet.attach_shared_memory(block.name)
+            self.assertEqual(len(wn), 82115)
+            self.assertEqual([syn.id for syn in wn.get_synsets("bank")],
+                             [syn.id for syn in self.wn.get_synsets("bank")])
+            self.assertEqual(wn.lch_similarity(wn.verticesDict[domestic_dog.id], wn.verticesDict[domestic_cat.id]),
+                             self.wn.lch_similarity(domestic_dog, domestic_cat))
+
+            with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn")) as executor:
+                distances = list(executor.map(attached_distance, [block.name] * 2,
+                                              [domestic_dog.id] * 2, [domestic_cat.id, domestic_dog.id]))
+            self.assertEqual(distances, [4, 0])
+
+            # releasing the attached WordNet does not fail to close the block
+            unraisable = []
+            hook, sys.unraisablehook = sys.unraisablehook, unraisable.append
+            try:
+                del wn
+                gc.collect()
+            finally:
+                sys.unraisablehook = hook
+            self.assertEqual(unraisable, [])
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_statistics(self):
+        statistics = self.wn.statistics()
+        self.assertEqual(statistics['synsets'], 82115)
+        self.assertEqual(statistics['relations'], 84427)
+        self.assertEqual(statistics['roots'], ['37987'])
+        self.assertEqual(statistics['depth_wordnet'], 19)
+        self.assertEqual(sum(statistics['out_degrees'].values()), 82115)
+        self.assertEqual(sum(degree * count for degree, count in statistics['in_degrees'].items()), 84427)
+        self.assertEqual(sum(statistics['depth_histogram'].values()), 82115)
+        self.assertEqual(statistics['leaves'], len(self.wn.leaves()))
+        self.assertEqual(statistics['multi_parent'],
+                         sum(1 for relations in self.wn.edgesdict.values() if len(relations) > 1))
+        self.assertIs(self.wn.statistics(), statistics)
+        self.assertEqual(str(self.wn), 'This object of WordNet consists of 82115 synsets, 84427 relations, and its overall depth is 19.')
+
+    def test_hypernym_closure(self):
+        domestic_dog = next(
+            syn for syn in self.wn.get_synsets("dog") if "domestic_dog" in syn.name)
+        indptr, indices, data = self.wn.hypernym_closure(weighted=True)
+        self.assertEqual(len(indptr), 82116)
+        self.assertEqual(len(indices), indptr[-1])
+        row = slice(indptr[domestic_dog.index], indptr[domestic_dog.index + 1])
+        self.assertEqual(dict(zip(indices[row], data[row])),
+                         {syn.index: distance for syn, (_, distance) in self.wn.bfs(domestic_dog).items()})
+        self.assertEqual(set(self.wn.hypernym_closure()[2]), {1})
+        self.assertEqual(len(self.wn.hypernym_closure(include_self=True)[1]), len(indices) + 82115)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            closure_file = os.path.join(tmp, "closure.bin")
+            for weighted, include_self in ((True, False), (False, True)):
+                self.wn.save_hypernym_closure(closure_file, weighted, include_self)
+                closure = load_hypernym_closure(closure_file)
+                self.assertEqual([list(array) for array in closure],
+                                 [list(array) for array in self.wn.hypernym_closure(weighted, include_self)])
+                del closure
+
+    @unittest.skipUnless(HAS_SCIPY, "SciPy is not installed")
+    def test_hypernym_closure_matrix(self):
+        for weighted, include_self in ((True, False), (False, True)):
+            indptr, indices, data = self.wn.hypernym_closure(weighted, include_self)
+            matrix = self.wn.hypernym_closure_matrix(weighted, include_self)
+            self.assertEqual(matrix.shape, (len(indptr) - 1, len(indptr) - 1))
+            self.assertEqual(list(matrix.indptr), list(indptr))
+            self.assertEqual(list(matrix.indices), list(indices))
+            self.assertEqual(list(matrix.data), list(data))
+
+    def test_hypernym_closure_matrix_without_scipy(self):
+        with mock.patch.dict(sys.modules, {"scipy": None, "scipy.sparse": None}):
+            with self.assertRaises(ImportError) as raised:
+                self.wn.hypernym_closure_matrix()
+        self.assertEqual(str(raised.exception),
+                         "hypernym_closure_matrix needs SciPy, hypernym_closure returns the plain CSR arrays.")
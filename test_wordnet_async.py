@@ -0,0 +1,86 @@
+#!/usr/bin/env/python3
+
+import asyncio
+import threading
+import time
+import unittest
+
+from wordnet import WordNet
+from wordnet_async import AsyncWordNet
+
+
+class TestAsyncWordNet(unittest.IsolatedAsyncioTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.wn = WordNet("data/synsets.txt", "data/hypernyms.txt")
+
+    async def test_queries(self):
+        async with AsyncWordNet(self.wn, max_workers=2) as awn:
+            dog_synsets = await awn.get_synsets("dog")
+            domestic_dog = next(
+                syn for syn in dog_synsets if "domestic_dog" in syn.name)
+            cat_synsets = await awn.get_synsets("cat")
+            domestic_cat = next(
+                syn for syn in cat_synsets if "true_cat" in syn.name)
+
+            distance, similarity, hyp = await asyncio.gather(
+                awn.distance(domestic_dog, domestic_cat),
+                awn.lch_similarity(domestic_dog, domestic_cat),
+                awn.lowest_common_hypernyms(domestic_dog, domestic_cat))
+            self.assertEqual(distance, 4)
+            self.assertAlmostEqual(similarity, 2.028148247)
+            self.assertEqual(next(iter(hyp)).index, 27618)
+
+            lowest_common_hypernyms = await awn.noun_lowest_common_hypernyms("dog", "horse")
+            self.assertEqual(next(iter(lowest_common_hypernyms)).index, 61107)
+
+    async def test_coalescing_and_timeout(self):
+        release = threading.Event()
+        calls = []
+
+        class SlowWordNet:
+            def depth_wordnet(self):
+                calls.append(1)
+                release.wait()
+                return 19
+
+        async with AsyncWordNet(SlowWordNet(), max_workers=2) as awn:
+            first = asyncio.ensure_future(awn.depth_wordnet())
+            second = asyncio.ensure_future(awn.depth_wordnet())
+            with self.assertRaises(asyncio.TimeoutError):
+                await awn.depth_wordnet(timeout=0.01)
+
+            release.set()
+            self.assertEqual(await asyncio.gather(first, second), [19, 19])
+            self.assertEqual(len(calls), 1)
+
+    async def test_aclose_keeps_the_loop_running(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        class SlowWordNet:
+            def depth_wordnet(self):
+                started.set()
+                release.wait()
+                return 19
+
+        awn = AsyncWordNet(SlowWordNet(), max_workers=1)
+        query = asyncio.ensure_future(awn.depth_wordnet())
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        with self.assertRaises(asyncio.TimeoutError):
+            await awn.depth_wordnet(timeout=0.01)
+
+        # the query is released by another thread in any case, a blocking close would stall the loop until then
+        timer = threading.Timer(1.0, release.set)
+        timer.start()
+        start = time.perf_counter()
+        closing = asyncio.ensure_future(awn.__aexit__(None, None, None))
+        await asyncio.sleep(0.05)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertFalse(closing.done())
+
+        release.set()
+        timer.cancel()
+        await closing
+        self.assertEqual(await query, 19)
@@ -3,90 +3,327 @@ A WordNet class to represent the WordNet synsets and the hyperonymy relation bet
 by Jinghua Xu
 """
 
+import contextlib
+import functools
+import heapq
+import inspect
 import math
-from itertools import chain
+import mmap
+import multiprocessing
+import multiprocessing.resource_tracker
+import multiprocessing.shared_memory
+import operator
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import warnings
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from collections.abc import Mapping
+from itertools import compress
+from concurrent.futures import ProcessPoolExecutor
+
+# binary snapshot layout: header, section table, then 8-byte aligned sections
+SNAPSHOT_MAGIC = b'WNSNAP\x00\x00'
+SNAPSHOT_VERSION = 1
+LCA_INDEX_MAGIC = b'WNLCAIDX'
+IC_TABLE_MAGIC = b'WNICTABL'
+CLOSURE_MAGIC = b'WNCLOSUR'
+_HEADER = struct.Struct('=8sIII')
+_SECTION = struct.Struct('=16s1s7xQQ')
+_BYTE_ORDER_MARK = 0x01020304
+
+# public methods timed by enable_profiling
+_PROFILED_METHODS = ('get_synsets', 'get_synsets_many', 'iter_synsets', 'lookup', 'complete', 'suggest', 'bfs',
+                     'iter_paths_to_root', 'paths_to_root', 'count_paths_to_root', 'iter_shortest_paths_to_root',
+                     'min_depth', 'max_depth', 'hyponyms', 'descendants', 'is_descendant', 'subtree_size', 'is_leaf',
+                     'leaves', 'lowest_common_hypernyms', 'distance', 'depth_wordnet', 'lch_similarity',
+                     'distance_many', 'lch_similarity_many', 'information_content', 'resnik_similarity',
+                     'lin_similarity', 'jcn_similarity', 'similarity_matrix', 'noun_lowest_common_hypernyms',
+                     'statistics', 'hypernym_closure', 'hypernym_closure_matrix', 'save_hypernym_closure')
+# derived indexes computed from the hypernym relation, dropped when it changes (the graphs themselves are patched)
+_STRUCTURE_INDEXES = ('topological_order', 'depths', 'depth_wordnet', 'lca', 'subtree_sizes', 'path_counts', 'ic',
+                      'statistics')
+# derived indexes computed from the lemmas, dropped when a synset is added
+_LEMMA_INDEXES = ('lemma_index', 'lemma_synsets', 'lemma_synset_indexes')
+
+# private helpers whose work is counted by enable_profiling: helper name : counter name
+_PROFILED_COUNTERS = {'_bfs': 'bfs_nodes_visited',
+                      '_iter_index_paths': 'paths_enumerated'}
 
 
 class WordNet:
     """API for querying WordNet information"""
 
-    def __init__(self, synsets_file, hypernyms_file):
+    def __init__(self, synsets_file, hypernyms_file, cache_size=None, compact=False, trace_memory=False):
         """
         Constructor for the WordNet class. Build WordNet based on synsets file and hypernyms file.
+        Both files are streamed line by line; synsets and the lemma index are built in one pass over the synsets file,
+        the relations in one pass over the hypernyms file. Malformed lines (and lines repeating a synset id or a hypernym origin id) are skipped with a warning, see load_stats.
         Parameters
         ----------
         synsets_file : string
             The file path of synset file.
         hypernyms_file : string
             The file path of hypernyms file.
+        cache_size : int
+            Maximum number of bfs results kept in an LRU cache, None or 0 disables the cache.
+        compact : bool
+            If True the hypernym relation is only stored as integer arrays (see _HypernymGraph),
+            Relation objects are created on demand when edgesdict is accessed.
+        trace_memory : bool
+            If True the peak memory allocated while loading is measured with tracemalloc (which slows loading down) and reported in load_stats.
         """
+        start_time = time.perf_counter()
+        tracing = trace_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif trace_memory:
+            tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
         # dictionary id: synset
         id2synset = dict()
-
-        with open(synsets_file, 'r', encoding='utf-8') as f_synsets:
-            lines = f_synsets.readlines()
-            for line in lines:
-                # line = line.rstrip('\n')
-                data = line.split(',')
-                id = data[0]
-                # list of lemmas(string)
-                lemmas = data[1].split(' ')
-                # list of lemmas(object of Lemma)
-                new_lemmas = []
-                for lemma in lemmas:
-                    l = Lemma(lemma)
-                    new_lemmas.append(l)
-
-                gloss = data[2]
-
-                synset = Synset(id, new_lemmas, gloss)
-
-                id2synset[id] = synset
+        # dictionary lemma string : Lemma, every synset shares the same (interned) Lemma objects
+        lemma_table = dict()
+        # dictionary lemma : list of synsets where this lemma appears
+        lemma2synset = dict()
+        # (file path, line number) of skipped lines
+        malformed = []
+
+        for line_number, id, lemmas, gloss in _read_synsets(synsets_file, malformed):
+            if id in id2synset:
+                malformed.append((synsets_file, line_number))
+                continue
+            # list of lemmas(object of Lemma)
+            new_lemmas = []
+            for lemma in lemmas:
+                l = lemma_table.get(lemma)
+                if l is None:
+                    l = lemma_table[lemma] = Lemma(sys.intern(lemma))
+                    lemma2synset[l] = []
+                new_lemmas.append(l)
+
+            synset = Synset(id, new_lemmas, gloss)
+
+            id2synset[id] = synset
+            for l in new_lemmas:
+                lemma2synset[l].append(synset)
 
         self._verticesDict = id2synset
 
         # dictionary oringin id : list of relations
         origin2relation = dict()
-        with open(hypernyms_file, 'r', encoding='utf-8') as f_hypernyms:
-            lines = f_hypernyms.readlines()
-            for line in lines:
-
-                line = line.rstrip('\n')
-                data = line.split(',')
-
-                origin_id = data[0]
-                origin = id2synset[origin_id]
-
-                # list of ids that are hyper
-                hypers = data[1:]
-
-                relations = []
-
-                for hyper in hypers:
-                    destination_id = hyper
-                    # for better readability
-                    origin = id2synset[origin_id]
-                    destination = id2synset[destination_id]
-                    relation = Relation(origin, destination)
-                    relations.append(relation)
+        # compact: dictionary origin index : list of hypernym indexes
+        adjacency = dict()
+        # origin ids already read, a repeated origin line is skipped like a repeated synset id
+        origins = set()
+        for line_number, origin_id, hypers in _read_hypernyms(hypernyms_file, malformed):
+            origin = id2synset.get(origin_id)
+            destinations = [id2synset.get(hyper) for hyper in hypers]
+            if origin is None or None in destinations or origin_id in origins:
+                malformed.append((hypernyms_file, line_number))
+                continue
+            origins.add(origin_id)
+
+            if compact:
+                adjacency[origin.index] = [
+                    destination.index for destination in destinations]
+            else:
+                origin2relation[origin_id] = [
+                    Relation(origin, destination) for destination in destinations]
+
+        if compact:
+            size = max((synset.index for synset in id2synset.values()), default=-1) + 1
+            self._hypernym_graph = _HypernymGraph.from_adjacency(size, adjacency)
+            self._edgesDict = _GraphRelations(self._hypernym_graph, id2synset)
+        else:
+            # built from _edgesDict on first use, see _graph
+            self._hypernym_graph = None
+            self._edgesDict = origin2relation
 
-                origin2relation[origin_id] = relations
+        self._lemmasDict = lemma2synset
+        self._snapshot = None
+        self._init_indexes(cache_size)
+
+        if malformed:
+            warnings.warn('Skipped {} malformed line(s), first one: {}:{}.'.format(
+                len(malformed), *malformed[0]))
+        self._load_stats = {
+            'seconds': time.perf_counter() - start_time,
+            'synsets': len(id2synset),
+            'relations': sum(len(hypers) for hypers in adjacency.values()) if compact
+            else sum(len(relations) for relations in origin2relation.values()),
+            'lemmas': len(lemma2synset),
+            'malformed_lines': malformed,
+        }
+        if trace_memory:
+            self._load_stats['peak_memory'] = tracemalloc.get_traced_memory()[
+                1] - memory_before
+            if tracing:
+                tracemalloc.stop()
 
-        self._edgesDict = origin2relation
+        # self._root = self._verticesDict['37987']
 
-        # dictionary lemma : list of synsets where this lemma appears
-        lemma2synset = dict()
-        for synset in id2synset.values():
-            for lemma in synset.lemma:
+    @classmethod
+    def from_snapshot(cls, snapshot_file, cache_size=None):
+        """
+        Alternative constructor: build WordNet from a binary snapshot written by save_snapshot.
+        The file is memory-mapped, synsets, relations and lemmas are only created when they are accessed.
+        Parameters
+        ----------
+        snapshot_file : string
+            The file path of the snapshot file.
+        cache_size : int
+            Maximum number of bfs results kept in an LRU cache, None or 0 disables the cache.
+        Return
+        ------
+        wn : WordNet
+            An object of WordNet backed by the memory-mapped snapshot.
+        """
+        start_time = time.perf_counter()
+        with open(snapshot_file, 'rb') as f_snapshot:
+            buffer = mmap.mmap(f_snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls._from_snapshot(_Snapshot(buffer, snapshot_file), cache_size, start_time)
 
-                if lemma in lemma2synset.keys():
-                    lemma2synset[lemma].append(synset)
-                else:
-                    lemma2synset[lemma] = [synset]
+    @classmethod
+    def attach_shared_memory(cls, name, cache_size=None):
+        """
+        Alternative constructor: build WordNet on a shared memory block created by to_shared_memory, typically in each worker of a pre-forking server.
+        The block is attached read-only and not copied: all workers read the same physical pages, synsets, relations and lemmas are only created
+        when they are accessed, like with from_snapshot. The block stays attached as long as the WordNet object is alive.
+        Parameters
+        ----------
+        name : string
+            The name of the shared memory block.
+        cache_size : int
+            Maximum number of bfs results kept in an LRU cache, None or 0 disables the cache.
+        Return
+        ------
+        wn : WordNet
+            An object of WordNet backed by the shared memory block.
+        """
+        start_time = time.perf_counter()
+        block = _attach_shared_memory(name)
+        snapshot = _Snapshot(block.buf.toreadonly(), shared_memory=name, block=block)
+        return cls._from_snapshot(snapshot, cache_size, start_time)
 
-        self._lemmasDict = lemma2synset
+    def to_shared_memory(self, name=None):
+        """
+        Copy the flat arrays of this WordNet, in the layout of save_snapshot, into a new shared memory block which other processes attach to
+        with WordNet.attach_shared_memory. The caller owns the block: it has to call close() and unlink() on it once the workers are done.
+        Parameter
+        ---------
+        name : string
+            The name of the block, None for a generated one.
+        Return
+        ------
+        block : multiprocessing.shared_memory.SharedMemory
+            The shared memory block, its name attribute is the name to pass to attach_shared_memory.
+        """
+        sections = self._snapshot_sections()
+        block = multiprocessing.shared_memory.SharedMemory(
+            name=name, create=True, size=_section_table(SNAPSHOT_MAGIC, sections)[2])
+        _copy_sections(block.buf, SNAPSHOT_MAGIC, sections)
+        return block
+
+    @classmethod
+    def _from_snapshot(cls, snapshot, cache_size, start_time):
+        """A private helper of from_snapshot and attach_shared_memory building a WordNet on the lazy views of a _Snapshot."""
+        wn = cls.__new__(cls)
+        wn._verticesDict = _SnapshotVertices(snapshot)
+        wn._hypernym_graph = _HypernymGraph(snapshot.hyper_off, snapshot.hyper)
+        wn._edgesDict = _GraphRelations(wn._hypernym_graph, wn._verticesDict)
+        wn._lemmasDict = _SnapshotLemmas(snapshot, wn._verticesDict)
+        wn._snapshot = snapshot
+        wn._init_indexes(cache_size)
+        wn._load_stats = {'seconds': time.perf_counter() - start_time,
+                          'synsets': len(snapshot.order),
+                          'relations': len(snapshot.hyper),
+                          'lemmas': len(snapshot.lemma_strings),
+                          'malformed_lines': []}
+        return wn
+
+    def save_snapshot(self, snapshot_file):
+        """
+        Write the synsets, the lemma index and the hypernym adjacency of this WordNet to a versioned binary snapshot,
+        which can be loaded with WordNet.from_snapshot.
+        All per-synset arrays are indexed by Synset.index.
+        Parameter
+        ---------
+        snapshot_file : string
+            The file path of the snapshot file to write.
+        """
+        _write_sections(snapshot_file, SNAPSHOT_MAGIC, self._snapshot_sections())
+
+    def _snapshot_sections(self):
+        """A private helper returning the (name, array) sections of a snapshot of this WordNet, see save_snapshot."""
+        vertices = list(self._verticesDict.values())
+        for synset in vertices:
+            if str(synset.index) != synset.id:
+                raise ValueError(
+                    "Synset id {!r} is not a canonical integer, it cannot be stored in a snapshot.".format(synset.id))
+        size = max((synset.index for synset in vertices), default=-1) + 1
+
+        # sorted lemma string table, lemma number is the position in the table
+        lemma_strings = sorted(lemma.lemma for lemma in self._lemmasDict)
+        lemma_number = {lemma: i for i, lemma in enumerate(lemma_strings)}
+        lemma_str, lemma_str_off = _pack_strings(lemma_strings)
+        posting_off = array('i', [0])
+        posting = array('i')
+        for lemma in lemma_strings:
+            posting.extend(synset.index for synset in self._lemmasDict[Lemma(lemma)])
+            posting_off.append(len(posting))
+
+        # per synset: lemmas, gloss and hypernyms
+        by_index = [None] * size
+        for synset in vertices:
+            by_index[synset.index] = synset
+        present = array('B', bytes(size))
+        lemma_off = array('i', [0])
+        lemma_ids = array('i')
+        glosses = []
+        for index, synset in enumerate(by_index):
+            if synset is not None:
+                present[index] = 1
+                lemma_ids.extend(lemma_number[lemma.lemma] for lemma in synset.lemma)
+                glosses.append(synset.gloss)
+            else:
+                glosses.append('')
+            lemma_off.append(len(lemma_ids))
+        gloss, gloss_off = _pack_strings(glosses)
+        graph = self._graph()
+
+        order = array('i', (synset.index for synset in vertices))
+
+        return [
+            ('order', order),
+            ('present', present),
+            ('hyper_off', graph.offsets),
+            ('hyper', graph.targets),
+            ('lemma_off', lemma_off),
+            ('lemma_ids', lemma_ids),
+            ('lemma_str_off', lemma_str_off),
+            ('lemma_str', lemma_str),
+            ('posting_off', posting_off),
+            ('posting', posting),
+            ('gloss_off', gloss_off),
+            ('gloss', gloss),
+        ]
 
-        # self._root = self._verticesDict['37987']
+    @property
+    def load_stats(self):
+        """
+        Statistics of loading this WordNet: seconds, number of synsets, relations and lemmas, the (file path, line number) of skipped malformed lines
+        and, if the constructor was called with trace_memory=True, the peak memory allocated while loading (peak_memory, in bytes).
+        """
+        return self._load_stats
 
     @property
     def edgesdict(self):
@@ -100,6 +337,570 @@ class WordNet:
     def lemmasDict(self):
         return self._lemmasDict
 
+    def _init_indexes(self, cache_size):
+        """A private helper setting up the derived indexes and the bfs cache, called by the constructors."""
+        # derived indexes (e.g. depths) computed on first use, see _derived
+        self._indexes = dict()
+        self._bfs_cache = _LRUCache(cache_size) if cache_size else None
+        # see enable_profiling
+        self._profiler = None
+
+    def cache_info(self):
+        """
+        Returns the statistics of the bfs cache.
+        Return
+        ------
+        info : dict
+            hits, misses, evictions, size and maxsize of the cache, None if the cache is disabled.
+        """
+        if self._bfs_cache is None:
+            return None
+        return self._bfs_cache.info()
+
+    def cache_clear(self):
+        """Drop all bfs results from the cache and reset its statistics."""
+        if self._bfs_cache is not None:
+            self._bfs_cache.clear()
+
+    def enable_profiling(self, window=10000):
+        """
+        Start recording, for every public query method, the number of calls, the cumulative time and the latency percentiles,
+        together with work counters: the synsets visited by bfs traversals (bfs_nodes_visited, cache hits do not traverse)
+        and the paths enumerated to the root (paths_enumerated). The work counters are totalled and also attributed to the
+        profiled method called by the user, e.g. the bfs traversals of distance are counted under distance. Likewise only the calls made by
+        the user are recorded, the methods called internally (e.g. depth_wordnet by lch_similarity) are part of the outer call.
+        The methods of this object are replaced by timed wrappers, the class is not changed: while profiling is disabled there is no overhead.
+        Calling it again while profiling is enabled keeps the recorded statistics.
+        Parameter
+        ---------
+        window : int
+            Number of most recent calls of each method the percentiles are computed from.
+        """
+        if self._profiler is not None:
+            return
+        profiler = self._profiler = _Profiler(window)
+        for name in _PROFILED_METHODS:
+            setattr(self, name, profiler.timed(name, getattr(self, name)))
+        for name, counter in _PROFILED_COUNTERS.items():
+            setattr(self, name, profiler.counted(counter, getattr(self, name)))
+
+    def disable_profiling(self):
+        """
+        Stop profiling and restore the plain methods.
+        Return
+        ------
+        stats : dict
+            The final statistics, see profile_stats, None if profiling was not enabled.
+        """
+        if self._profiler is None:
+            return None
+        stats = self._profiler.stats()
+        for name in _PROFILED_METHODS + tuple(_PROFILED_COUNTERS):
+            self.__dict__.pop(name, None)
+        self._profiler = None
+        return stats
+
+    def profile_stats(self):
+        """
+        Returns the statistics recorded since enable_profiling (or profile_reset).
+        Return
+        ------
+        stats : dict
+            'methods': method name : dictionary with calls, seconds (cumulative), the p50, p90, p99 and max latency in seconds
+            and 'counters', counter name : work done by the calls of the method,
+            'counters': counter name : total. None if profiling is disabled.
+        """
+        if self._profiler is None:
+            return None
+        return self._profiler.stats()
+
+    def profile_reset(self):
+        """Drop the statistics recorded so far, profiling stays enabled."""
+        if self._profiler is not None:
+            self._profiler.reset()
+
+    def profile_prometheus(self, prefix='wordnet'):
+        """
+        Returns the recorded statistics in the Prometheus text exposition format: a summary of the latencies labelled by method
+        and one counter per work counter. An empty string if profiling is disabled.
+        Parameter
+        ---------
+        prefix : string
+            Prefix of the metric names.
+        """
+        if self._profiler is None:
+            return ''
+        return self._profiler.prometheus(prefix)
+
+    def build_lca_index(self):
+        """
+        Precompute the LCA index: the sorted ancestors of every synset (itself included) with their distances, built in one pass
+        in topological order. Once built (or loaded with load_lca_index), lowest_common_hypernyms, distance and the similarity methods
+        read the ancestors from the index instead of running bfs. The index is dropped when the graph changes.
+        """
+        self._indexes.pop('lca', None)
+        self._ancestor_index()
+
+    def save_lca_index(self, index_file):
+        """
+        Write the LCA index (built first if needed) to a binary file, so that it can be loaded with load_lca_index instead of being rebuilt.
+        Parameter
+        ---------
+        index_file : string
+            The file path of the index file to write.
+        """
+        if 'lca' not in self._indexes:
+            self.build_lca_index()
+        lca_index = self._indexes['lca']
+        _write_sections(index_file, LCA_INDEX_MAGIC, [
+            ('graph_crc', array('I', [_graph_checksum(self._graph())])),
+            ('offsets', lca_index.offsets),
+            ('ancestors', lca_index.ancestors),
+            ('distances', lca_index.distances_array),
+        ])
+
+    def load_lca_index(self, index_file):
+        """
+        Memory-map an LCA index written by save_lca_index and use it for all lowest common hypernym queries.
+        Raises ValueError if the index was computed for a different hypernym graph.
+        Parameter
+        ---------
+        index_file : string
+            The file path of the index file.
+        """
+        with open(index_file, 'rb') as f_index:
+            buffer = mmap.mmap(f_index.fileno(), 0, access=mmap.ACCESS_READ)
+        sections = _read_sections(buffer, LCA_INDEX_MAGIC)
+        if sections['graph_crc'][0] != _graph_checksum(self._graph()):
+            raise ValueError(
+                "The LCA index {} was computed for a different hypernym graph.".format(index_file))
+        self._indexes['lca'] = _AncestorIndex(
+            sections['offsets'], sections['ancestors'], sections['distances'])
+
+    def _derived(self, name, build):
+        """
+        A private helper returning the derived index called name, the index is built by calling build() on first use and kept until the graph changes.
+        Parameters
+        ----------
+        name : string
+            The name of the index.
+        build : callable
+            A function without arguments building the index.
+        """
+        try:
+            return self._indexes[name]
+        except KeyError:
+            index = self._indexes[name] = build()
+            return index
+
+    def _invalidate(self, indexes=None, synset=None):
+        """
+        A private helper dropping derived indexes and cached bfs results, it has to be called whenever synsets or relations change.
+        Parameters
+        ----------
+        indexes : iterable
+            Names of the derived indexes to drop, None for all of them.
+        synset : int
+            Index of the synset whose hypernyms changed: only the cached bfs results of that synset and of the synsets having it as an ancestor
+            are dropped. None to drop all cached bfs results.
+        """
+        if indexes is None:
+            self._indexes.clear()
+        else:
+            for name in indexes:
+                self._indexes.pop(name, None)
+        if synset is None:
+            self.cache_clear()
+        elif self._bfs_cache is not None:
+            self._bfs_cache.discard_where(
+                lambda index, entry: index == synset or synset in entry[0])
+
+    def add_synset(self, id, lemmas, gloss=''):
+        """
+        Add a synset (without hypernyms, see add_hypernym) to this WordNet in place. The lemma index is updated and the derived indexes
+        depending on the lemmas are dropped and rebuilt on demand. The new synset is a root without hyponyms, it does not change the
+        depths, ancestors or paths of the other synsets: the indexes computed from the hypernym relation are extended with its row
+        (a memory-mapped LCA index is dropped), cached bfs results are kept.
+        Parameters
+        ----------
+        id : string
+            The id of the new synset, a non-negative integer which is not the id of another synset.
+        lemmas : list
+            The lemma strings of the synset, or one string of space separated lemmas as in the synsets file.
+        gloss : string
+            The gloss of the synset.
+        Return
+        ------
+        synset : Synset
+            The new synset.
+        """
+        if id in self._verticesDict:
+            raise ValueError("A synset with id {!r} already exists.".format(id))
+        if not (isinstance(id, str) and id.isdigit() and str(int(id)) == id):
+            raise ValueError("Synset id {!r} is not a canonical non-negative integer.".format(id))
+        if isinstance(lemmas, str):
+            lemmas = lemmas.split()
+        new_lemmas = [Lemma(sys.intern(lemma)) for lemma in dict.fromkeys(lemmas)]
+        synset = Synset(id, new_lemmas, gloss)
+
+        if isinstance(self._verticesDict, _SnapshotVertices):
+            self._verticesDict.add(synset)
+        else:
+            self._verticesDict[id] = synset
+        for lemma in new_lemmas:
+            if isinstance(self._lemmasDict, _SnapshotLemmas):
+                self._lemmasDict.add(lemma, synset)
+            else:
+                self._lemmasDict.setdefault(lemma, []).append(synset)
+
+        for graph in (self._hypernym_graph, self._indexes.get('graph'), self._indexes.get('hyponym_graph')):
+            if graph is not None:
+                graph.resize(synset.index + 1)
+        vertex_indexes = self._indexes.get('vertex_indexes')
+        if vertex_indexes is not None:
+            vertex_indexes.append(synset.index)
+        if isinstance(self._edgesDict, _GraphRelations):
+            self._edgesDict.changed(id)
+        self._synset_added(synset.index)
+        self._invalidate(_LEMMA_INDEXES + ('statistics',), synset.index)
+        return synset
+
+    def _synset_added(self, index):
+        """A private helper of add_synset adding the row of a new synset without hypernyms and hyponyms to the built structure indexes."""
+        indexes = self._indexes
+
+        def extend(name, value, fill=0):
+            values = indexes.get(name)
+            if values is not None:
+                if not isinstance(values, array):
+                    # memory-mapped, e.g. by load_ic
+                    values = indexes[name] = array(values.format, values)
+                values.extend([fill] * (index + 1 - len(values)))
+                values[index] = value
+
+        order = indexes.get('topological_order')
+        if order is not None:
+            # no hypernyms: it can come anywhere
+            order.append(index)
+        depths = indexes.get('depths')
+        if depths is not None:
+            for values in depths:
+                values.extend([0] * (index + 1 - len(values)))
+        if indexes.get('depth_wordnet') == 0:
+            # the first synset
+            indexes['depth_wordnet'] = 1
+        extend('subtree_sizes', 1)
+        extend('path_counts', 1)
+        # no frequency: infinite information content, like the synsets without counts in load_frequencies
+        extend('ic', math.inf, math.inf)
+        lca_index = indexes.get('lca')
+        if lca_index is not None:
+            offsets = lca_index.offsets
+            if isinstance(offsets, array) and len(offsets) <= index + 1:
+                # rows in index order: empty rows for the unused indexes, then the synset alone
+                offsets.extend([offsets[-1]] * (index + 1 - len(offsets)))
+                lca_index.ancestors.append(index)
+                lca_index.distances_array.append(0)
+                offsets.append(len(lca_index.ancestors))
+            else:
+                del indexes['lca']
+
+    def add_hypernym(self, synset, hypernym):
+        """
+        Add the relation synset -> hypernym in place. The hypernym graphs are patched, the derived indexes computed from the hypernym relation
+        (depths, LCA index, path counts, ...) are dropped and rebuilt on demand, and only the cached bfs results of synset and its descendants are dropped.
+        The rebuild is paid by the next query needing one of those indexes, a full pass over the graph (about a second for the LCA index
+        on the whole WordNet): batch the edits before querying again. A loaded information content table is dropped too, see load_frequencies.
+        Raises ValueError if the relation would create a cycle.
+        Parameters
+        ----------
+        synset : Synset
+            The origin of the relation.
+        hypernym : Synset
+            The destination of the relation.
+        Return
+        ------
+        relation : Relation
+            The new relation, or the existing one if hypernym already is a hypernym of synset.
+        """
+        synset, hypernym = self._synset(synset.index), self._synset(hypernym.index)
+        if synset.id in self._edgesDict:
+            for relation in self._edgesDict[synset.id]:
+                if relation.destination == hypernym:
+                    return relation
+        if synset == hypernym or synset.index in self._bfs(hypernym.index):
+            raise ValueError("Adding {} as a hypernym of {} would create a cycle.".format(
+                hypernym.id, synset.id))
+
+        relation = Relation(synset, hypernym)
+        if isinstance(self._edgesDict, _GraphRelations):
+            self._hypernym_graph.insert(synset.index, hypernym.index)
+            self._edgesDict.changed(synset.id)
+        else:
+            self._edgesDict.setdefault(synset.id, []).append(relation)
+            graph = self._indexes.get('graph')
+            if graph is not None:
+                graph.insert(synset.index, hypernym.index)
+        self._hypernyms_changed(synset, hypernym, True)
+        return relation
+
+    def remove_hypernym(self, synset, hypernym):
+        """
+        Remove the relation synset -> hypernym in place, the derived indexes and cached bfs results are updated like by add_hypernym.
+        Raises ValueError if hypernym is not a hypernym of synset.
+        Parameters
+        ----------
+        synset : Synset
+            The origin of the relation.
+        hypernym : Synset
+            The destination of the relation.
+        """
+        synset, hypernym = self._synset(synset.index), self._synset(hypernym.index)
+        if synset.id not in self._edgesDict or not any(
+                relation.destination == hypernym for relation in self._edgesDict[synset.id]):
+            raise ValueError("{} is not a hypernym of {}.".format(hypernym.id, synset.id))
+
+        if isinstance(self._edgesDict, _GraphRelations):
+            self._hypernym_graph.delete(synset.index, hypernym.index)
+            self._edgesDict.changed(synset.id)
+        else:
+            relations = [relation for relation in self._edgesDict[synset.id]
+                         if relation.destination != hypernym]
+            if relations:
+                self._edgesDict[synset.id] = relations
+            else:
+                # root nodes have no entry
+                del self._edgesDict[synset.id]
+            graph = self._indexes.get('graph')
+            if graph is not None:
+                graph.delete(synset.index, hypernym.index)
+        self._hypernyms_changed(synset, hypernym, False)
+
+    def _hypernyms_changed(self, synset, hypernym, added):
+        """A private helper of add_hypernym and remove_hypernym patching the hyponym graph and dropping what depends on the ancestors of synset."""
+        hyponym_graph = self._indexes.get('hyponym_graph')
+        if hyponym_graph is not None:
+            if added:
+                hyponym_graph.insert(hypernym.index, synset.index, keep_sorted=True)
+            else:
+                hyponym_graph.delete(hypernym.index, synset.index)
+        # the ancestors of synset and of its descendants changed
+        self._invalidate(_STRUCTURE_INDEXES, synset.index)
+
+    def _graph(self):
+        """
+        A private helper returning the hypernym relation as a _HypernymGraph (CSR arrays indexed by Synset.index).
+        All traversals run on it, Relation objects are only created by the public methods returning them.
+        """
+        if self._hypernym_graph is not None:
+            return self._hypernym_graph
+        return self._derived('graph', self._build_graph)
+
+    def _build_graph(self):
+        size = max((synset.index for synset in self._verticesDict.values()), default=-1) + 1
+        adjacency = {self._verticesDict[id].index: [relation.destination.index for relation in relations]
+                     for id, relations in self._edgesDict.items()}
+        return _HypernymGraph.from_adjacency(size, adjacency)
+
+    def _synset(self, index):
+        """A private helper returning the synset with the given index."""
+        return self._verticesDict[str(index)]
+
+    def _relation(self, origin, destination):
+        """A private helper returning the Relation between the synsets with index origin and index destination."""
+        for relation in self._edgesDict[str(origin)]:
+            if relation.destination.index == destination:
+                return relation
+        raise KeyError((origin, destination))
+
+    def _vertex_indexes(self):
+        """A private helper returning the indexes of all synsets, in iteration order."""
+        return self._derived('vertex_indexes', lambda: array('i', (int(id) for id in self._verticesDict)))
+
+    def _topological_order(self):
+        """
+        A private helper returning the indexes of all synsets in topological order: every synset comes after all of its hypernyms.
+        Return
+        ------
+        order : array
+            Array of synset indexes, roots first.
+        """
+        return self._derived('topological_order', self._build_topological_order)
+
+    def _build_topological_order(self):
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        order = array('i')
+        done = bytearray(graph.size)
+        # iterative dfs along hypernym edges, a synset is emitted once all of its hypernyms are emitted
+        for start in self._vertex_indexes():
+            if done[start]:
+                continue
+            done[start] = 1
+            # (synset index, position of the next hypernym to visit in targets)
+            stack = [(start, offsets[start])]
+            while stack:
+                u, j = stack[-1]
+                if j < offsets[u + 1]:
+                    stack[-1] = (u, j + 1)
+                    v = targets[j]
+                    if not done[v]:
+                        done[v] = 1
+                        stack.append((v, offsets[v]))
+                else:
+                    stack.pop()
+                    order.append(u)
+        return order
+
+    def _depths(self):
+        """
+        A private helper returning the depth index: two arrays (min_depths, max_depths) indexed by Synset.index.
+        min_depth is the length of the shortest and max_depth the length of the longest path from the synset to a root node.
+        The index is computed in a single pass over the synsets in topological order.
+        """
+        return self._derived('depths', self._build_depths)
+
+    def _build_depths(self):
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        min_depths = array('i', bytes(4 * graph.size))
+        max_depths = array('i', bytes(4 * graph.size))
+        for u in self._topological_order():
+            start, end = offsets[u], offsets[u + 1]
+            if start != end:
+                min_depths[u] = 1 + min(min_depths[targets[j]] for j in range(start, end))
+                max_depths[u] = 1 + max(max_depths[targets[j]] for j in range(start, end))
+        return min_depths, max_depths
+
+    def min_depth(self, synset):
+        """
+        Returns the length (number of edges) of the shortest path from synset to the root node.
+        Parameter
+        ---------
+        synset : Synset
+            The synset whose depth is looked up.
+        Return
+        ------
+        depth : int
+            The minimal depth of synset.
+        """
+        return self._depths()[0][synset.index]
+
+    def max_depth(self, synset):
+        """
+        Returns the length (number of edges) of the longest path from synset to the root node.
+        Parameter
+        ---------
+        synset : Synset
+            The synset whose depth is looked up.
+        Return
+        ------
+        depth : int
+            The maximal depth of synset.
+        """
+        return self._depths()[1][synset.index]
+
+    def _hyponym_graph(self):
+        """A private helper returning the reversed hypernym relation as a _HypernymGraph: row i holds the hyponym indexes of synset i."""
+        return self._derived('hyponym_graph', lambda: self._graph().reverse())
+
+    def _ancestor_index(self):
+        """A private helper returning the LCA index (see build_lca_index), it is built if it has been neither built nor loaded."""
+        return self._derived('lca', lambda: _AncestorIndex.build(self._graph(), self._topological_order()))
+
+    def hyponyms(self, synset):
+        """
+        Returns the direct hyponyms of synset, the synsets having synset as a hypernym.
+        Parameter
+        ---------
+        synset : Synset
+            The hypernym.
+        Return
+        ------
+        synsets : list
+            The hyponyms of synset, sorted by index.
+        """
+        return [self._synset(index) for index in self._hyponym_graph().hypernyms(synset.index)]
+
+    def descendants(self, synset):
+        """
+        Returns all the synsets below synset: its hyponyms, their hyponyms and so on. The traversal only visits the returned synsets
+        (and the hyponym rows of each of them once), its cost is linear in the size of the result.
+        Parameter
+        ---------
+        synset : Synset
+            The root of the subtree.
+        Return
+        ------
+        synsets : list
+            The descendants of synset (synset itself excluded), in depth first order.
+        """
+        graph = self._hyponym_graph()
+        offsets, targets = graph.offsets, graph.targets
+        seen = {synset.index}
+        descendants = []
+        stack = [synset.index]
+        while stack:
+            u = stack.pop()
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                if v not in seen:
+                    seen.add(v)
+                    descendants.append(v)
+                    stack.append(v)
+        return [self._synset(index) for index in descendants]
+
+    def is_descendant(self, synset, ancestor):
+        """
+        True if synset is below ancestor, i.e. ancestor is one of its (direct or indirect) hypernyms.
+        It is a binary search in the ancestor row of synset in the LCA index (which is built on the first call), so it takes constant time
+        for a bounded depth.
+        Parameters
+        ----------
+        synset : Synset
+            The possible descendant.
+        ancestor : Synset
+            The possible ancestor.
+        """
+        return synset.index != ancestor.index and self._ancestor_index().is_ancestor(ancestor.index, synset.index)
+
+    def subtree_size(self, synset):
+        """
+        Returns the number of synsets in the subtree rooted at synset, synset itself included. Synsets reachable on several paths are counted once.
+        The sizes of all subtrees are computed together on the first call by counting, for every synset, the rows of the LCA index it appears in.
+        Parameter
+        ---------
+        synset : Synset
+            The root of the subtree.
+        Return
+        ------
+        size : int
+            1 + the number of descendants of synset.
+        """
+        def build():
+            lca_index = self._ancestor_index()
+            sizes = array('i', bytes(4 * (len(lca_index.offsets) - 1)))
+            for ancestor in lca_index.ancestors:
+                sizes[ancestor] += 1
+            return sizes
+
+        return self._derived('subtree_sizes', build)[synset.index]
+
+    def is_leaf(self, synset):
+        """True if synset has no hyponyms."""
+        return self._hyponym_graph().is_root(synset.index)
+
+    def leaves(self):
+        """
+        Returns the synsets without hyponyms.
+        Return
+        ------
+        synsets : list
+            The leaves of the hierarchy, in iteration order.
+        """
+        graph = self._hyponym_graph()
+        return [self._synset(index) for index in self._vertex_indexes() if graph.is_root(index)]
+
     def get_synsets(self, noun):
         """
         Returns the list of synsets where noun appears as a lemma. An empty list should be returned if the noun is not part of any WordNet synsets.
@@ -115,10 +916,152 @@ class WordNet:
         synsets = []
         lemma = Lemma(noun)
         lemmas_dict = self._lemmasDict
-        for synset in lemmas_dict[lemma]:
+        for synset in lemmas_dict.get(lemma, ()):
             synsets.append(synset)
         return synsets
 
+    def get_synsets_many(self, tokens, indexes=False):
+        """
+        Batch version of get_synsets: every distinct token is looked up once, without creating Lemma objects or copying synset lists.
+        Parameters
+        ----------
+        tokens : iterable
+            Lemma strings, duplicates are resolved once.
+        indexes : bool
+            If True the synsets are given by their index (Synset.index) instead of as Synset objects.
+        Return
+        ------
+        synsets : dict
+            token : tuple of synsets (or indexes), an empty tuple for tokens that are not a lemma.
+        """
+        resolve = self._lemma_resolver(indexes)
+        synsets = dict()
+        for token in tokens:
+            if token not in synsets:
+                synsets[token] = resolve(token)
+        return synsets
+
+    def iter_synsets(self, tokens, indexes=False, memo_size=4096):
+        """
+        Streaming version of get_synsets_many: yields the synsets of every token in order, for token streams of any length.
+        Memory stays bounded: at most memo_size recently seen tokens are remembered.
+        Parameters
+        ----------
+        tokens : iterable
+            Lemma strings, e.g. a generator over the nouns of a document.
+        indexes : bool
+            If True the synsets are given by their index (Synset.index) instead of as Synset objects.
+        memo_size : int
+            Number of recently resolved tokens kept in an LRU memo, only used by WordNets loaded from a snapshot
+            (otherwise every lookup is already a single dictionary access).
+        Yield
+        -----
+        (token, synsets) : tuple
+            The token and the tuple of its synsets (or indexes), empty for tokens that are not a lemma.
+        """
+        resolve = self._lemma_resolver(indexes)
+        if self._snapshot is not None and memo_size:
+            memo = _LRUCache(memo_size)
+            for token in tokens:
+                synsets = memo.get(token)
+                if synsets is None:
+                    synsets = resolve(token)
+                    memo.put(token, synsets)
+                yield token, synsets
+        else:
+            for token in tokens:
+                yield token, resolve(token)
+
+    def _lemma_resolver(self, indexes):
+        """
+        A private helper returning a function mapping a lemma string to the tuple of its synsets (or their indexes), empty for unknown strings.
+        The tuples are read from a derived lemma string index or, for a WordNet loaded from a snapshot, from the posting lists of the snapshot.
+        """
+        snapshot = self._snapshot
+        if isinstance(self._lemmasDict, _SnapshotLemmas) and not self._lemmasDict.modified:
+            posting_off, posting = snapshot.posting_off, snapshot.posting
+            synset = self._synset
+
+            def resolve(token):
+                number = snapshot.lemma_number(token)
+                if number < 0:
+                    return ()
+                postings = posting[posting_off[number]:posting_off[number + 1]]
+                return tuple(postings) if indexes else tuple(synset(index) for index in postings)
+            return resolve
+
+        if indexes:
+            table = self._derived('lemma_synset_indexes', lambda: {
+                lemma.lemma: tuple(synset.index for synset in synsets) for lemma, synsets in self._lemmasDict.items()})
+        else:
+            table = self._derived('lemma_synsets', lambda: {
+                lemma.lemma: tuple(synsets) for lemma, synsets in self._lemmasDict.items()})
+
+        def resolve(token):
+            return table.get(token, ())
+        return resolve
+
+    def _lemma_index(self):
+        """A private helper returning the normalized lemma index (see _LemmaIndex), built on first use."""
+        return self._derived('lemma_index', lambda: _LemmaIndex(
+            lemma.lemma for lemma in self._lemmasDict))
+
+    def lookup(self, word):
+        """
+        Like get_synsets, but the word is matched case-insensitively and with spaces and underscores treated alike,
+        e.g. 'Domestic Dog' finds the synsets of the lemma domestic_dog.
+        Parameter
+        ---------
+        word : string
+            A lemma, in any case, with spaces or underscores between its words.
+        Return
+        ------
+        synsets : list
+            The synsets of all lemmas matching word, an empty list if there is none.
+        """
+        synsets = []
+        seen = set()
+        for lemma in self._lemma_index().lemmas(word):
+            for synset in self._lemmasDict[Lemma(lemma)]:
+                if synset.index not in seen:
+                    seen.add(synset.index)
+                    synsets.append(synset)
+        return synsets
+
+    def complete(self, prefix, limit=None):
+        """
+        Autocompletion: returns the lemmas starting with prefix, normalized like lookup.
+        Parameters
+        ----------
+        prefix : string
+            The beginning of the lemmas.
+        limit : int
+            Return at most this many lemmas, None for no limit.
+        Return
+        ------
+        lemmas : list
+            Lemma strings, in the order of their normalized forms.
+        """
+        return self._lemma_index().complete(prefix, limit)
+
+    def suggest(self, word, max_distance=2, limit=None):
+        """
+        Spelling suggestions: returns the lemmas within max_distance edits (insertions, deletions, substitutions) of word, normalized like lookup.
+        Parameters
+        ----------
+        word : string
+            A possibly misspelled lemma.
+        max_distance : int
+            The largest edit distance of a suggestion.
+        limit : int
+            Return at most this many suggestions, None for no limit.
+        Return
+        ------
+        suggestions : list
+            (lemma, edit distance) tuples, closest first.
+        """
+        return self._lemma_index().suggest(word, max_distance, limit)
+
     def bfs(self, synset):
         """
         Returns a dictionary containing all the hypernym synsets on the paths from the current synset to the root node by runing a bfs traversal.
@@ -134,26 +1077,56 @@ class WordNet:
             while the values should be tuples of the form (relation, distance). relation is the Relation edge used to discover that hypernym and distance is the integer distance,
             measured in number of edges, from the synset given as parameter to the current key.
         """
+        entry = self._bfs_entry(synset.index)
+        # the Synset keyed dictionary is built once per cache entry, a cache hit costs a copy
+        if entry[1] is None:
+            discovered = dict()
+            for hyper, (origin, distance) in entry[0].items():
+                discovered[self._synset(hyper)] = (
+                    self._relation(origin, hyper), distance)
+            entry[1] = discovered
+        return dict(entry[1])
+
+    def _cached_bfs(self, index):
+        """A private helper returning the result of _bfs through the LRU cache (if enabled), the returned dictionary is shared and must not be modified."""
+        return self._bfs_entry(index)[0]
+
+    def _bfs_entry(self, index):
+        """A private helper returning the LRU cache entry of index: [result of _bfs, result of bfs or None until it is first asked for]."""
+        cache = self._bfs_cache
+        if cache is None:
+            return [self._bfs(index), None]
+        entry = cache.get(index)
+        if entry is None:
+            entry = [self._bfs(index), None]
+            cache.put(index, entry)
+        return entry
+
+    def _bfs(self, index):
+        """
+        A private helper running the bfs traversal on the hypernym graph, see bfs.
+        Return
+        ------
+        discovered : dictionary
+            hypernym index : (origin index, distance), origin is the synset the hypernym was discovered from.
+        """
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
         # level number
         distance = 1
         # return dict
         discovered = dict()
         # list of vertices in each level, first level contains only synset
-        level = [synset]
-        while len(level) > 0:
+        level = [index]
+        while level:
             next_level = []
-            # for each vertex in this level(the origins)
+            # for each vertex in this level(the origins), the root node has no outgoing edges
             for u in level:
-                # hitting the root node, no outgoing edges from u
-                if u.id not in self._edgesDict:
-                    break
-                # incident relations whose origin is u
-                incident_relations = self._edgesDict[u.id]
-                for relation in incident_relations:
+                for j in range(offsets[u], offsets[u + 1]):
                     # the hyper synset
-                    v = relation.destination
+                    v = targets[j]
                     if v not in discovered:
-                        discovered[v] = (relation, distance)
+                        discovered[v] = (u, distance)
                         next_level.append(v)
             level = next_level
             distance += 1
@@ -162,7 +1135,7 @@ class WordNet:
 
     def print_paths_to_root(self, current_synset, path, split_idx):
         """
-        A private helper function prints all paths(represented as relations) from synset to root node based on DFS.
+        A helper function printing all paths(represented as relations) from synset to root node based on DFS.
         Parameters
         ----------
         current_synset : Synset
@@ -187,9 +1160,73 @@ class WordNet:
                 hyper_to_current = relation.destination
                 self.print_paths_to_root(hyper_to_current, path, split_idx)
 
+    def iter_paths_to_root(self, synset, max_paths=None, max_depth=None):
+        """
+        A generator yielding the paths from synset to the root node one at a time, in the same order as print_paths_to_root visits them, without printing anything.
+        The paths are enumerated depth first with an explicit stack, callers can stop early by not exhausting the generator.
+        Parameters
+        ----------
+        synset : Synset
+            The seynset vertice where the yielded paths are from.
+        max_paths : int
+            Stop after this many paths, None for no limit.
+        max_depth : int
+            Only yield paths with at most this many relations, deeper branches are not explored. None for no limit.
+        Yield
+        -----
+        path : Path
+            A path from synset to root.
+        """
+        for indexes in self._iter_index_paths(synset.index, max_paths, max_depth):
+            yield Path([self._relation(origin, destination)
+                        for origin, destination in zip(indexes, indexes[1:])])
+
+    def _iter_index_paths(self, index, max_paths=None, max_depth=None):
+        """A private helper enumerating the root paths of iter_paths_to_root on the hypernym graph, each path is yielded as a list of synset indexes."""
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        if max_paths is not None and max_paths <= 0:
+            return
+        # synset is the root node: a single empty path
+        if offsets[index] == offsets[index + 1]:
+            yield [index]
+            return
+
+        count = 0
+        # synsets of the current path
+        path = [index]
+        # position of the next hypernym to visit in targets, one per synset on the current path
+        stack = [offsets[index]]
+        while stack:
+            u = path[-1]
+            j = stack[-1]
+            if j == offsets[u + 1]:
+                stack.pop()
+                path.pop()
+                continue
+            stack[-1] = j + 1
+
+            v = targets[j]
+            path.append(v)
+            # too many relations, even if v is the root node
+            if max_depth is not None and len(path) - 1 > max_depth:
+                path.pop()
+            # hitting the root node
+            elif offsets[v] == offsets[v + 1]:
+                yield list(path)
+                count += 1
+                if max_paths is not None and count >= max_paths:
+                    return
+                path.pop()
+            elif max_depth is not None and len(path) > max_depth:
+                path.pop()
+            else:
+                stack.append(offsets[v])
+
     def paths_to_root(self, synset):
         """
-        A function to print all the different paths from a particular synset to the root node. The function returns a list of Path objects, wihch are paths from synset to root.
+        A function to compute all the different paths from a particular synset to the root node. The function returns a list of Path objects, wihch are paths from synset to root.
+        Nothing is printed, see iter_paths_to_root to enumerate the paths lazily and print_paths_to_root to print them.
         Parameter
         ---------
         synset : Synset
@@ -199,28 +1236,119 @@ class WordNet:
         paths_to_root : list
             A list of objects of Path, which are paths from synset to root.
         """
-        paths_to_root = []
-        # parameters passed to function's initial call
-        tmp_path = []
-        split_idx = []
-        self.print_paths_to_root(synset, tmp_path, split_idx)
-        split_idx.pop()
-
-        # split path
-        temp = zip(chain([0], split_idx), chain(split_idx, [None]))
-        paths = list(tmp_path[i: j] for i, j in temp)
+        return list(self.iter_paths_to_root(synset))
 
-        for path in paths:
-            p = Path(path)
-            # or print path here(vertices repr in this case)
-            # print(p)
-            paths_to_root.append(p)
-        return paths_to_root
+    def count_paths_to_root(self, synset):
+        """
+        Returns the number of different paths from synset to the root node, without enumerating them.
+        The counts of all synsets are computed together on the first call, in one pass in topological order:
+        the count of a synset is the sum of the counts of its hypernyms, and 1 for the root node.
+        Parameter
+        ---------
+        synset : Synset
+            The seynset vertice where the paths are from.
+        Return
+        ------
+        count : int
+            len(paths_to_root(synset)).
+        """
+        def build():
+            graph = self._graph()
+            offsets, targets = graph.offsets, graph.targets
+            counts = array('q', bytes(8 * graph.size))
+            for u in self._topological_order():
+                start, end = offsets[u], offsets[u + 1]
+                counts[u] = 1 if start == end else sum(counts[targets[j]] for j in range(start, end))
+            return counts
+
+        return self._derived('path_counts', build)[synset.index]
+
+    def iter_shortest_paths_to_root(self, synset, k=None):
+        """
+        A generator yielding the paths from synset to the root node from the shortest to the longest, e.g. the k shortest paths,
+        without enumerating the others. Partial paths are expanded best first, ordered by their length plus the min_depth of their last synset,
+        which is the exact length of their shortest completion: only partial paths that can still be among the next shortest ones are expanded.
+        Parameters
+        ----------
+        synset : Synset
+            The seynset vertice where the yielded paths are from.
+        k : int
+            Stop after this many paths, None for all of them.
+        Yield
+        -----
+        path : Path
+            A path from synset to root, paths of equal length are yielded in the order they were reached.
+        """
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        min_depths = self._depths()[0]
+        count = 0
+        # heap of (estimated length, sequence number, length, partial path), a partial path is a linked list (index, previous partial path)
+        # sharing its prefix with the other partial paths
+        sequence = 0
+        heap = [(min_depths[synset.index], sequence, 0, (synset.index, None))]
+        while heap and (k is None or count < k):
+            _, _, length, partial = heapq.heappop(heap)
+            u = partial[0]
+            start, end = offsets[u], offsets[u + 1]
+            if start == end:
+                indexes = []
+                while partial is not None:
+                    indexes.append(partial[0])
+                    partial = partial[1]
+                indexes.reverse()
+                yield Path([self._relation(origin, destination)
+                            for origin, destination in zip(indexes, indexes[1:])])
+                count += 1
+                continue
+            for j in range(start, end):
+                v = targets[j]
+                sequence += 1
+                heapq.heappush(heap, (length + 1 + min_depths[v], sequence, length + 1, (v, partial)))
+
+    def _ancestor_distances(self, index):
+        """
+        A private helper returning the distance map of the synset with the given index: a dictionary containing the synset itself (distance 0)
+        and all of its hypernyms as keys (synset indexes), and the distances found by bfs as values.
+        """
+        lca_index = self._indexes.get('lca')
+        if lca_index is not None:
+            return lca_index.distances(index)
+        distances = {index: 0}
+        for hyper, (_, distance) in self._cached_bfs(index).items():
+            distances[hyper] = distance
+        return distances
+
+    def _lowest_common(self, distances1, distances2):
+        """
+        A private helper intersecting two distance maps (see _ancestor_distances).
+        Return
+        ------
+        (indexes, distance) : tuple
+            The set of common hypernyms (indexes) with the minimum combined distance and that distance, (set(), None) if there is no common hypernym.
+        """
+        # iterate over the smaller map, probe the bigger one
+        if len(distances1) > len(distances2):
+            distances1, distances2 = distances2, distances1
+        indexes = set()
+        best = None
+        for index, distance1 in distances1.items():
+            distance2 = distances2.get(index)
+            if distance2 is None:
+                continue
+            distance = distance1 + distance2
+            if best is None or distance < best:
+                best = distance
+                indexes = {index}
+            elif distance == best:
+                indexes.add(index)
+        return indexes, best
 
     def lowest_common_hypernyms(self, synset1, synset2):
         """
         A function to compute the lowest common hypernyms between two synsets.
         (A common hypernym is a hypernym that is on the path to root starting from both synset1 and synset2. The lowest common hypernym is the first hypernym that is common to both synsets.)
+        The ancestors of both synsets are collected by bfs, the lowest common hypernyms are the common ones with the minimum combined distance.
         Parameters
         ----------
         synset1 : Synset
@@ -232,39 +1360,14 @@ class WordNet:
         synsets : set
             The set of the lowest common hypernyms between synset1 and synset2.
         """
-        synsets1 = set()
-        synsets2 = set()
-        paths1 = self.paths_to_root(synset1)
-        paths2 = self.paths_to_root(synset2)
-        for p1 in paths1:
-            vertices_p1 = p1.vertices
-            tmp = dict()
-            for p2 in paths2:
-                vertices_p2 = p2.vertices
-                for v1 in vertices_p1:
-                    if v1 in vertices_p2:
-                        tmp[v1] = vertices_p1.index(v1)
-                        break
-            synsets1.add(min(tmp, key=tmp.get))
-
-        for p1 in paths2:
-            vertices_p1 = p1.vertices
-            tmp = dict()
-            for p2 in paths1:
-                vertices_p2 = p2.vertices
-                for v1 in vertices_p1:
-                    if v1 in vertices_p2:
-                        tmp[v1] = vertices_p1.index(v1)
-                        break
-            synsets2.add(min(tmp, key=tmp.get))
-
-        synsets = synsets1.intersection(synsets2)
-
-        return synsets
+        indexes, _ = self._lowest_common(self._ancestor_distances(synset1.index),
+                                         self._ancestor_distances(synset2.index))
+        return {self._synset(index) for index in indexes}
 
     def distance(self, synset1, synset2):
         """
         A function to compute the distance between two synsets. Returns the length (number of edges) of the shortest path between the two synsets.
+        The shortest path goes from synset1 up to one of their lowest common hypernyms and down to synset2.
         Parameters
         ----------
         synset1 : Synset
@@ -274,40 +1377,34 @@ class WordNet:
         Return
         ------
         dist : int
-            The distance between synset1 and synset2.
+            The distance between synset1 and synset2, None if they do not have a common hypernym.
         """
-        dist = 0
-        dists = []
-        lchs = self.lowest_common_hypernyms(synset1, synset2)
-        discovered1 = self.bfs(synset1)
-        discovered2 = self.bfs(synset2)
-        for lch in lchs:
-            dist1 = discovered1[lch][1]
-            dist2 = discovered2[lch][1]
-            add = dist1 + dist2
-            dists.append(add)
-
-            dist = min(dists)
-            return dist
+        _, dist = self._lowest_common(self._ancestor_distances(synset1.index),
+                                      self._ancestor_distances(synset2.index))
+        return dist
 
     def depth_wordnet(self):
         """
         A helper function of lch_similarity computing the overall depth of word net.
-        This function calculates the longest possible path from each possible leaf node to root node.
+        The overall depth is the largest distance (as measured by bfs) from any synset to any of its hypernyms, plus one.
+        It is computed once from the depth index and reused until the graph changes: the largest min_depth is a lower bound and
+        the max_depth of a synset an upper bound of its bfs distances, so only the synsets whose max_depth exceeds that lower bound are traversed.
         Return
         ------
         depth : int
             The overall depth of word net.
         """
-        depth = 0
-        distances_to_root = []
-        for vertice in self._verticesDict.values():
-            discovered = self.bfs(vertice)
-            for relation_distance_tuple in discovered.values():
-                distances_to_root.append(relation_distance_tuple[1])
-        # depth is distance plus one
-        depth = max(distances_to_root) + 1
-        return depth
+        def build():
+            min_depths, max_depths = self._depths()
+            indexes = self._vertex_indexes()
+            depth = max((min_depths[index] for index in indexes), default=-1)
+            for index in indexes:
+                # a path to a hypernym followed by a path to the root is at most max_depth long
+                if max_depths[index] > depth:
+                    depth = max(depth, max(self._ancestor_distances(index).values()))
+            return depth + 1
+
+        return self._derived('depth_wordnet', build)
 
     def lch_similarity(self, synset1, synset2):
         """
@@ -321,7 +1418,8 @@ class WordNet:
         Return
         ------
         lc_dist : int
-            The Leacock-Chodorow distance between synset1 and synset2.
+            The Leacock-Chodorow distance between synset1 and synset2, None if they do not have a common hypernym
+            (e.g. after add_synset or remove_hypernym created another root).
         """
         lc_dist = 0
         depth = self.depth_wordnet()
@@ -329,13 +1427,324 @@ class WordNet:
             raise Exception(
                 "The overall depth of the hierachy is 0, this will lead to a division by 0.")
         else:
+            dist = self.distance(synset1, synset2)
+            if dist is None:
+                return None
             lc_dist = - \
-                math.log((1 + self.distance(synset1, synset2))/(depth*2))
+                math.log((1 + dist)/(depth*2))
         return lc_dist
 
+    def distance_many(self, pairs):
+        """
+        Batch version of distance. The distance map of each distinct synset is computed only once per batch,
+        so the cost grows with the number of distinct synsets rather than with the number of pairs.
+        Parameter
+        ---------
+        pairs : iterable
+            (synset1, synset2) tuples of Synset objects.
+        Return
+        ------
+        dists : list
+            The distance of every pair, in the order of pairs (None for pairs without a common hypernym).
+        """
+        distance_maps = dict()
+        dists = []
+        for synset1, synset2 in pairs:
+            index1, index2 = synset1.index, synset2.index
+            distances1 = distance_maps.get(index1)
+            if distances1 is None:
+                distances1 = distance_maps[index1] = self._ancestor_distances(
+                    index1)
+            distances2 = distance_maps.get(index2)
+            if distances2 is None:
+                distances2 = distance_maps[index2] = self._ancestor_distances(
+                    index2)
+            dists.append(self._lowest_common(distances1, distances2)[1])
+        return dists
+
+    def lch_similarity_many(self, pairs):
+        """
+        Batch version of lch_similarity, sharing the traversal work between pairs like distance_many.
+        Parameter
+        ---------
+        pairs : iterable
+            (synset1, synset2) tuples of Synset objects.
+        Return
+        ------
+        lc_dists : list
+            The Leacock-Chodorow distance of every pair, in the order of pairs (None for pairs without a common hypernym).
+        """
+        depth = self.depth_wordnet()
+        if depth == 0:
+            raise Exception(
+                "The overall depth of the hierachy is 0, this will lead to a division by 0.")
+        return [None if dist is None else -math.log((1 + dist)/(depth*2))
+                for dist in self.distance_many(pairs)]
+
+    def load_frequencies(self, frequency_file, smoothing=0.0):
+        """
+        Compute the information content table used by resnik_similarity, lin_similarity and jcn_similarity from corpus frequencies.
+        Every line of the file is a lemma and its count separated by a comma, the count is divided equally between the synsets of the lemma
+        (unknown lemmas are ignored, malformed lines skipped with a warning). The frequency of a synset is the total count of itself and its descendants,
+        each counted once even if it is reachable on several paths: it is accumulated by one pass over the LCA index, adding the count of every synset
+        to all of its ancestors. The information content of a synset is -log(frequency / total count), inf for a frequency of 0.
+        The table is dropped when the graph changes, see save_ic and load_ic to store it.
+        Parameters
+        ----------
+        frequency_file : string
+            The file path of the frequency file.
+        smoothing : float
+            Count added to every synset before propagation, e.g. 1.0 so that no synset has an infinite information content.
+        """
+        resolve = self._lemma_resolver(True)
+        graph = self._graph()
+        counts = array('d', bytes(8 * graph.size))
+        malformed = []
+        with open(frequency_file, encoding='utf-8') as f_frequencies:
+            for line_number, line in enumerate(f_frequencies, 1):
+                if not line.strip():
+                    continue
+                lemma, _, count = line.rpartition(',')
+                try:
+                    count = float(count)
+                except ValueError:
+                    malformed.append(line_number)
+                    continue
+                indexes = resolve(lemma.strip())
+                for index in indexes:
+                    counts[index] += count / len(indexes)
+        if malformed:
+            warnings.warn('Skipped {} malformed line(s), first one: {}:{}.'.format(
+                len(malformed), frequency_file, malformed[0]))
+
+        vertex_indexes = self._vertex_indexes()
+        if smoothing:
+            for index in vertex_indexes:
+                counts[index] += smoothing
+        total = sum(counts)
+        if total <= 0:
+            raise ValueError(
+                "The frequency file {} has no counts for any synset.".format(frequency_file))
+
+        lca_index = self._ancestor_index()
+        offsets, ancestors = lca_index.offsets, lca_index.ancestors
+        frequencies = array('d', bytes(8 * graph.size))
+        for index in vertex_indexes:
+            count = counts[index]
+            if count:
+                for j in range(offsets[index], offsets[index + 1]):
+                    frequencies[ancestors[j]] += count
+        self._indexes['ic'] = array('d', (-math.log(frequency / total) if frequency > 0 else math.inf
+                                          for frequency in frequencies))
+
+    def save_ic(self, ic_file):
+        """
+        Write the information content table (see load_frequencies) to a binary file, so that it can be loaded with load_ic.
+        Parameter
+        ---------
+        ic_file : string
+            The file path of the table file to write.
+        """
+        _write_sections(ic_file, IC_TABLE_MAGIC, [
+            ('graph_crc', array('I', [_graph_checksum(self._graph())])),
+            ('ic', self._information_content()),
+        ])
+
+    def load_ic(self, ic_file):
+        """
+        Memory-map an information content table written by save_ic.
+        Raises ValueError if the table was computed for a different hypernym graph.
+        Parameter
+        ---------
+        ic_file : string
+            The file path of the table file.
+        """
+        with open(ic_file, 'rb') as f_ic:
+            buffer = mmap.mmap(f_ic.fileno(), 0, access=mmap.ACCESS_READ)
+        sections = _read_sections(buffer, IC_TABLE_MAGIC)
+        if sections['graph_crc'][0] != _graph_checksum(self._graph()):
+            raise ValueError(
+                "The information content table {} was computed for a different hypernym graph.".format(ic_file))
+        self._indexes['ic'] = sections['ic']
+
+    def _information_content(self):
+        """A private helper returning the information content table, an array of floats indexed by Synset.index."""
+        ic = self._indexes.get('ic')
+        if ic is None:
+            raise ValueError(
+                "No information content table, see load_frequencies and load_ic.")
+        return ic
+
+    def _common_ic(self, ic, distances1, distances2):
+        """A private helper returning the largest information content of a common hypernym of two distance maps, None if there is none."""
+        if len(distances1) > len(distances2):
+            distances1, distances2 = distances2, distances1
+        return max((ic[index] for index in distances1 if index in distances2), default=None)
+
+    def information_content(self, synset):
+        """
+        Returns the information content of synset, see load_frequencies.
+        Parameter
+        ---------
+        synset : Synset
+            The synset.
+        Return
+        ------
+        ic : float
+            -log of the probability of synset in the corpus.
+        """
+        return self._information_content()[synset.index]
+
+    def resnik_similarity(self, synset1, synset2):
+        """
+        A method to compute the Resnik similarity between two synsets: the information content of their most informative common hypernym.
+        Needs an information content table, see load_frequencies and load_ic.
+        Parameters
+        ----------
+        synset1 : Synset
+            One synset of the 2 synsets to compute the similarity.
+        synset2 : Synset
+            The other synset.
+        Return
+        ------
+        similarity : float
+            The Resnik similarity, None if the synsets do not have a common hypernym.
+        """
+        return self._common_ic(self._information_content(), self._ancestor_distances(synset1.index),
+                               self._ancestor_distances(synset2.index))
+
+    def lin_similarity(self, synset1, synset2):
+        """
+        A method to compute the Lin similarity between two synsets: 2 * IC(lcs) / (IC(synset1) + IC(synset2)), where lcs is their most informative
+        common hypernym (see resnik_similarity). Needs an information content table, see load_frequencies and load_ic.
+        Parameters
+        ----------
+        synset1 : Synset
+            One synset of the 2 synsets to compute the similarity.
+        synset2 : Synset
+            The other synset.
+        Return
+        ------
+        similarity : float
+            The Lin similarity between 0 and 1, None if the synsets do not have a common hypernym.
+        """
+        ic = self._information_content()
+        lcs_ic = self.resnik_similarity(synset1, synset2)
+        return None if lcs_ic is None else _lin(ic[synset1.index], ic[synset2.index], lcs_ic)
+
+    def jcn_similarity(self, synset1, synset2):
+        """
+        A method to compute the Jiang-Conrath similarity between two synsets: 1 / (IC(synset1) + IC(synset2) - 2 * IC(lcs)), where lcs is their most
+        informative common hypernym (see resnik_similarity). Needs an information content table, see load_frequencies and load_ic.
+        Parameters
+        ----------
+        synset1 : Synset
+            One synset of the 2 synsets to compute the similarity.
+        synset2 : Synset
+            The other synset.
+        Return
+        ------
+        similarity : float
+            The Jiang-Conrath similarity, inf for synsets with the same information content as their common hypernym (e.g. the same synset),
+            None if the synsets do not have a common hypernym.
+        """
+        ic = self._information_content()
+        lcs_ic = self.resnik_similarity(synset1, synset2)
+        return None if lcs_ic is None else _jcn(ic[synset1.index], ic[synset2.index], lcs_ic)
+
+    def similarity_matrix(self, synsets, metric='lch', top_k=None, workers=None, out=None, block_size=256):
+        """
+        Compute the similarity between all pairs of synsets. The rows are split into blocks which are scored by a pool of worker processes.
+        Workers share the graph by forking this process or, where fork is not available, by opening the snapshot (or shared memory block)
+        this WordNet was loaded from.
+        Parameters
+        ----------
+        synsets : iterable
+            The Synset objects, they are both the rows and the columns of the matrix.
+        metric : string
+            Name of the similarity metric, one of SIMILARITY_METRICS ('lch', 'distance', or, with an information content table, 'resnik', 'lin' or 'jcn').
+        top_k : int
+            If given, only the k most similar other synsets are kept for every row instead of the dense matrix.
+        workers : int
+            Number of worker processes, None for os.cpu_count(), 1 to compute everything in this process.
+        out : string
+            File path of a memory-mapped output, the dense matrix is written there as C doubles in row-major order. Ignored when top_k is given.
+        block_size : int
+            Number of rows per task.
+        Return
+        ------
+        matrix : list or memoryview
+            Dense: a list of array('d') rows, or a 2-dimensional memoryview of the mapped out file.
+            With top_k: a list with, for every row, a list of (column, score) tuples, most similar first.
+            Pairs without a common hypernym are scored as nan (and never appear in top_k lists).
+        """
+        if metric not in SIMILARITY_METRICS:
+            raise ValueError('Unknown similarity metric {!r}, expected one of {}.'.format(
+                metric, ', '.join(sorted(SIMILARITY_METRICS))))
+        indexes = [synset.index for synset in synsets]
+        n = len(indexes)
+        if n == 0:
+            return []
+        if top_k is not None:
+            out = None
+        if out is not None:
+            with open(out, 'wb') as f_out:
+                f_out.truncate(n * n * 8)
+
+        blocks = [(start, min(start + block_size, n))
+                  for start in range(0, n, block_size)]
+        state = (indexes, metric, top_k, out)
+        if workers == 1 or len(blocks) <= 1:
+            # scored in this thread: the state is passed explicitly, the module global is only used by worker processes
+            column_maps = [self._ancestor_distances(index) for index in indexes]
+            block_state = (self,) + state + (column_maps,)
+            results = [_score_block(block_state, start, end)
+                       for start, end in blocks]
+        else:
+            fork = 'fork' in multiprocessing.get_all_start_methods()
+            if fork:
+                # forked workers inherit the graph through the module global set here
+                context = multiprocessing.get_context('fork')
+                initargs = (None, None, None)
+                initializer = None
+            elif self._snapshot is not None and (self._snapshot.path is not None or self._snapshot.shared_memory is not None):
+                context = None
+                initializer = _init_similarity_worker
+                ic = self._indexes.get('ic')
+                if self._snapshot.path is not None:
+                    open_wordnet = functools.partial(WordNet.from_snapshot, self._snapshot.path)
+                else:
+                    open_wordnet = functools.partial(WordNet.attach_shared_memory, self._snapshot.shared_memory)
+                initargs = (None, open_wordnet, state,
+                            None if ic is None else array('d', ic))
+            else:
+                raise ValueError(
+                    'Parallel similarity_matrix needs fork or a WordNet loaded with WordNet.from_snapshot or WordNet.attach_shared_memory.')
+            # the module global of this process is set for forking, one parallel run at a time
+            with _similarity_lock if fork else contextlib.nullcontext():
+                try:
+                    if fork:
+                        _init_similarity_worker(self, None, state)
+                        _similarity_columns()
+                    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                             initializer=initializer, initargs=initargs) as executor:
+                        results = list(executor.map(
+                            _similarity_block, *zip(*blocks)))
+                finally:
+                    if fork:
+                        _init_similarity_worker(None, None, None)
+
+        if out is not None:
+            with open(out, 'r+b') as f_out:
+                buffer = mmap.mmap(f_out.fileno(), 0)
+            return memoryview(buffer).cast('d', (n, n))
+        return [row for rows in results for row in rows]
+
     def noun_lowest_common_hypernyms(self, noun1, noun2):
         """
         A function to compute the lowest common hypernyms between two nouns. The function returns a set of lowest common hypernyms.
+        The lowest common hypernyms of every pair of synsets of the two nouns are collected, and the deepest ones (by max_depth) are returned.
+        The distance map of each synset is computed once and reused for all of its pairs.
         Parameters
         ----------
         noun1 : string
@@ -345,35 +1754,194 @@ class WordNet:
         Return
         ------
         synsets : set
-            A set of lowest common hypernyms between the synsets of noun1 and noun2.
+            A set of lowest common hypernyms between the synsets of noun1 and noun2, empty if a noun is unknown or no pair of their synsets
+            has a common hypernym.
         """
-        synsets = set()
-
-        # possible synsets of nouns
-        synsets1 = self.get_synsets(noun1)
-        synsets2 = self.get_synsets(noun2)
+        # distance maps of the possible synsets of nouns
+        maps1 = [self._ancestor_distances(synset.index)
+                 for synset in self.get_synsets(noun1)]
+        maps2 = [self._ancestor_distances(synset.index)
+                 for synset in self.get_synsets(noun2)]
+
+        # lchs of each pair of possible synsets of given pair of nouns
+        candidates = set()
+        for distances1 in maps1:
+            for distances2 in maps2:
+                candidates |= self._lowest_common(distances1, distances2)[0]
+        if not candidates:
+            return set()
 
-        # a tmp dictionary stores key(distance of each lch to root node : value(corresponding lch)
-        dist2lch = dict()
         # according to the vague description of this exercise and the given example: return the lch(s) that is(are) furthest from root node, since node [48395] is ruled out while [61107] is accepted given the diffence being that the accepted one is further from the root node.
+        # go with the lch(s) which is farthest from the root node(deepest), measured by the longest path to the root
+        max_depths = self._depths()[1]
+        deepest = max(max_depths[index] for index in candidates)
+        return {self._synset(index) for index in candidates if max_depths[index] == deepest}
 
-        # each pair of possible synsets of given pair of nouns
-        for s1 in synsets1:
-            for s2 in synsets2:
-                lchs = self.lowest_common_hypernyms(s1, s2)
-                for lch in lchs:
-                    for path_to_root in self.paths_to_root(lch):
-                        dist_lch_to_root = len(path_to_root)
-                        if dist_lch_to_root not in dist2lch:
-                            dist2lch[dist_lch_to_root] = [lch]
-                        else:
-                            dist2lch[dist_lch_to_root].append(lch)
-        # go with the lch(s) which is farthest from the root node(deepest)
-        max_dist = max(dist2lch.keys())
-        for lch in dist2lch[max_dist]:
-            synsets.add(lch)
-
-        return synsets
+    def hypernym_closure(self, weighted=False, include_self=False):
+        """
+        Export the transitive closure of the hypernym relation as a sparse matrix in CSR form: row i holds the column indexes of all hypernyms
+        (direct or not) of the synset with index i, sorted. It is read from the LCA index, computed by one propagation in topological order
+        (see build_lca_index), not by a traversal per synset.
+        Parameters
+        ----------
+        weighted : bool
+            If True the values are the distances (as measured by bfs) from the synset to its hypernyms, otherwise they are all 1.
+        include_self : bool
+            If True every synset is in its own row, with value 0 if weighted.
+        Return
+        ------
+        (indptr, indices, data) : tuple
+            Arrays such that the row of synset i is indices[indptr[i]:indptr[i + 1]] with the values data[indptr[i]:indptr[i + 1]].
+            There is a row for every index up to the largest Synset.index.
+        """
+        lca_index = self._ancestor_index()
+        offsets, ancestors, distances = lca_index.offsets, lca_index.ancestors, lca_index.distances_array
+        if include_self:
+            indptr = array('q', offsets)
+            indices = array('i', ancestors)
+            data = array('i', distances)
+        else:
+            # every non-empty row contains the synset itself, the only entry with distance 0
+            indptr = array('q', [0])
+            removed = 0
+            for i in range(len(offsets) - 1):
+                if offsets[i + 1] != offsets[i]:
+                    removed += 1
+                indptr.append(offsets[i + 1] - removed)
+            indices = array('i', compress(ancestors, distances))
+            data = array('i', compress(distances, distances))
+        if not weighted:
+            data = array('i', [1]) * len(indices)
+        return indptr, indices, data
+
+    def hypernym_closure_matrix(self, weighted=False, include_self=False):
+        """
+        The hypernym closure (see hypernym_closure) as a scipy.sparse.csr_matrix of shape (n, n), n being the largest Synset.index plus one.
+        Raises ImportError if SciPy is not installed.
+        Parameters
+        ----------
+        weighted : bool
+            If True the values are the distances from the synset to its hypernyms, otherwise they are all 1.
+        include_self : bool
+            If True every synset is in its own row.
+        """
+        try:
+            import scipy.sparse
+        except ImportError:
+            raise ImportError(
+                "hypernym_closure_matrix needs SciPy, hypernym_closure returns the plain CSR arrays.") from None
+        indptr, indices, data = self.hypernym_closure(weighted, include_self)
+        n = len(indptr) - 1
+        return scipy.sparse.csr_matrix((data, indices, indptr), shape=(n, n))
+
+    def save_hypernym_closure(self, closure_file, weighted=False, include_self=False):
+        """
+        Write the hypernym closure (see hypernym_closure) to a binary file without holding it in memory, it can be mapped with load_hypernym_closure.
+        The rows are computed by a propagation in topological order: the row of a synset is merged from the rows of its hypernyms and kept only
+        until all of its hyponyms are done. Rows are spooled to temporary files in topological order, then copied to closure_file in index order.
+        Parameters
+        ----------
+        closure_file : string
+            The file path of the closure file to write.
+        weighted : bool
+            If True the values are the distances from the synset to its hypernyms, otherwise they are all 1.
+        include_self : bool
+            If True every synset is in its own row.
+        """
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        size = graph.size
+        # number of hyponyms not done yet
+        pending = array('i', bytes(4 * size))
+        for v in targets:
+            pending[v] += 1
+        # index : distance map of the synsets with pending hyponyms
+        rows = dict()
+        # position and length of every row in the temporary files
+        starts = array('q', bytes(8 * size))
+        lengths = array('i', bytes(4 * size))
+        position = 0
+
+        with tempfile.TemporaryFile() as f_indices, tempfile.TemporaryFile() as f_data:
+            for u in self._topological_order():
+                row = {u: 0}
+                for j in range(offsets[u], offsets[u + 1]):
+                    p = targets[j]
+                    for ancestor, distance in rows[p].items():
+                        distance += 1
+                        if row.get(ancestor, distance) >= distance:
+                            row[ancestor] = distance
+                    pending[p] -= 1
+                    if not pending[p]:
+                        del rows[p]
+                if pending[u]:
+                    rows[u] = row
+                keys = sorted(row)
+                if not include_self:
+                    keys.remove(u)
+                array('i', keys).tofile(f_indices)
+                array('i', [row[key] for key in keys] if weighted else [1] * len(keys)).tofile(f_data)
+                starts[u] = position
+                lengths[u] = len(keys)
+                position += len(keys)
+
+            indptr = array('q', [0])
+            for i in range(size):
+                indptr.append(indptr[-1] + lengths[i])
+            sections = [('indptr', indptr), ('indices', ('i', position)), ('data', ('i', position))]
+            table, section_offsets, _ = _section_table(CLOSURE_MAGIC, sections)
+            with open(closure_file, 'wb') as f_closure:
+                f_closure.write(table)
+                f_closure.write(bytes(section_offsets[0] - f_closure.tell()))
+                f_closure.write(indptr)
+                for f_rows, section_offset in zip((f_indices, f_data), section_offsets[1:]):
+                    f_closure.write(bytes(section_offset - f_closure.tell()))
+                    if not position:
+                        continue
+                    f_rows.flush()
+                    with mmap.mmap(f_rows.fileno(), 0, access=mmap.ACCESS_READ) as spooled:
+                        for i in range(size):
+                            start = starts[i] * 4
+                            f_closure.write(spooled[start:start + lengths[i] * 4])
+
+    def statistics(self):
+        """
+        Returns graph-wide statistics of the hypernym relation, computed once with a few passes over the arrays of the hypernym graph
+        and the depth index, and kept until the graph changes.
+        Return
+        ------
+        statistics : dict
+            synsets and relations: the number of synsets and relations,
+            out_degrees and in_degrees: histograms (dictionaries degree : number of synsets) of the number of hypernyms and of hyponyms,
+            depth_histogram: histogram of the min_depth of the synsets, depth_wordnet: see depth_wordnet,
+            roots: the ids of the synsets without hypernyms, leaves: the number of synsets without hyponyms,
+            multi_parent: the number of synsets with more than one hypernym.
+        """
+        return self._derived('statistics', self._build_statistics)
+
+    def _build_statistics(self):
+        graph = self._graph()
+        offsets, targets = graph.offsets, graph.targets
+        vertex_indexes = self._vertex_indexes()
+        # per row differences of the offsets, then the rows of the synsets
+        out_degrees = array('i', map(operator.sub, offsets[1:], offsets[:-1]))
+        out_degrees = array('i', map(out_degrees.__getitem__, vertex_indexes))
+        in_counts = Counter(targets)
+        in_degrees = array('i', map(in_counts.__getitem__, vertex_indexes))
+        min_depths = self._depths()[0]
+
+        out_histogram = Counter(out_degrees)
+        return {
+            'synsets': len(vertex_indexes),
+            'relations': len(targets),
+            'out_degrees': dict(sorted(out_histogram.items())),
+            'in_degrees': dict(sorted(Counter(in_degrees).items())),
+            'depth_histogram': dict(sorted(Counter(map(min_depths.__getitem__, vertex_indexes)).items())),
+            'depth_wordnet': self.depth_wordnet(),
+            'roots': sorted(str(index) for index, degree in zip(vertex_indexes, out_degrees) if degree == 0),
+            'leaves': in_degrees.count(0),
+            'multi_parent': len(out_degrees) - out_histogram[0] - out_histogram[1],
+        }
 
     def __iter__(self):
         yield from self._verticesDict.values()
@@ -391,12 +1959,10 @@ class WordNet:
             The meaningful string representaiton of an object of WordNet class.
         """
         repr = ''
-        num_synsets = len(self._verticesDict)
-        num_edges = 0
-        for edges in self._edgesDict.values():
-            for _ in edges:
-                num_edges += 1
-        overall_depth = self.depth_wordnet()
+        statistics = self.statistics()
+        num_synsets = statistics['synsets']
+        num_edges = statistics['relations']
+        overall_depth = statistics['depth_wordnet']
 
         repr = 'This object of WordNet consists of {} synsets, {} relations, and its overall depth is {}.'
         repr = repr.format(str(num_synsets), str(
@@ -407,6 +1973,8 @@ class WordNet:
 class Synset:
     """ The node(vertex) class Synset of the Graph class WordNet"""
 
+    __slots__ = ('_id', '_lemma', '_gloss', '_index')
+
     def __init__(self, id, lemma, gloss):
         """The constructor of this Synset class.
         Parameters
@@ -422,15 +1990,9 @@ class Synset:
         self._lemma = lemma
         self._gloss = gloss
 
-        # id represented as int
+        # id represented as int, the key of the synset in the arrays of the hypernym graph
         self._index = int(id)
 
-        name = []
-        for lm in lemma:
-            name.append(lm.lemma)
-        # list of lemmas represented as string of this synset.
-        self._name = name
-
     @property
     def id(self):
         """id getter: Return id associated with this Synset(vertex)
@@ -462,13 +2024,13 @@ class Synset:
 
     @property
     def name(self):
-        """name getter: Returns a list of lemmas represented as strings.
+        """name getter: Returns a list of lemmas represented as strings, derived from the lemmas of this synset.
         Return 
         ------
-        self._name : list
+        name : list
             List of lemmas represented as strings.
         """
-        return self._name
+        return [lm.lemma for lm in self._lemma]
 
     @property
     def index(self):
@@ -481,12 +2043,15 @@ class Synset:
         return self._index
 
     def __hash__(self):
-        """hash function of Synset returns the hash code of id which is the key(identifier) of a unique synset."""
-        return hash(self._id)
+        """hash function of Synset returns the hash code of the id (as int) which is the key(identifier) of a unique synset."""
+        return hash(self._index)
 
     def __eq__(self, othr):
+        """Two synsets are equal if they have the same id, the id is the key(identifier) of a unique synset."""
+        if self is othr:
+            return True
         if isinstance(othr, type(self)):
-            return ((self._id, self._lemma, self._gloss) == (othr._id, othr._lemma, othr._gloss))
+            return self._index == othr._index
 
         return NotImplemented
 
@@ -514,6 +2079,8 @@ class Synset:
 class Relation:
     """ The Relation class stores the origin and the destination of the relation.(functions as the Edge class of a Graph class)"""
 
+    __slots__ = ('_origin', '_destination', '_hash')
+
     def __init__(self, origin, destination):
         """
         The constructor of the edge class Realtion of Graph Synset
@@ -526,6 +2093,8 @@ class Relation:
         """
         self._origin = origin
         self._destination = destination
+        # computed once, relations are immutable
+        self._hash = hash((origin.index, destination.index))
 
     @property
     def origin(self):
@@ -552,9 +2121,17 @@ class Relation:
         Will allow edge to be a map/set key.
         Return
         ------
-        hash((self._origin, self._destination)) : int
-            a hashcode that is then used to insert objects into hashtables aka dictionaries"""
-        return hash((self._origin, self._destination))
+        self._hash : int
+            a hashcode that is then used to insert objects into hashtables aka dictionaries, computed from the ids of origin and destination"""
+        return self._hash
+
+    def __eq__(self, othr):
+        """Two relations are equal if they have the same origin and the same destination."""
+        if self is othr:
+            return True
+        if isinstance(othr, type(self)):
+            return self._origin == othr._origin and self._destination == othr._destination
+        return NotImplemented
 
     def __str__(self):
         """
@@ -575,6 +2152,8 @@ class Relation:
 class Lemma:
     """The Lemma class stores lemma."""
 
+    __slots__ = ('_lemma',)
+
     def __init__(self, lemma):
         """
         The constructor of the Lemma class
@@ -618,6 +2197,8 @@ class Lemma:
 class Path:
     """Path class represents paths from one synset(vertex) to another in wordnet(graph)."""
 
+    __slots__ = ('_edges', '_vertices')
+
     def __init__(self, relations):
         """
         The constructor of path class, creating a path based on a list of Relation objects.
@@ -628,18 +2209,21 @@ class Path:
         """
         edges = []
         verts = []
+        # vertices already in verts
+        seen = set()
 
         for relation in relations:
             edges.append(relation)
             origin = relation.origin
             destination = relation.destination
             # no duplicate vertices in verts
-            if origin not in verts:
+            if origin not in seen:
+                seen.add(origin)
                 verts.append(origin)
-            if destination not in verts:
+            if destination not in seen:
+                seen.add(destination)
                 verts.append(destination)
 
-        self._relations = relations
         self._edges = edges
         self._vertices = verts
 
@@ -679,6 +2263,1020 @@ class Path:
         return repr
 
 
+def compile_snapshot(synsets_file, hypernyms_file, snapshot_file):
+    """
+    One-time compile step: parse the synsets file and the hypernyms file and write them to a binary snapshot.
+    Parameters
+    ----------
+    synsets_file : string
+        The file path of synset file.
+    hypernyms_file : string
+        The file path of hypernyms file.
+    snapshot_file : string
+        The file path of the snapshot file to write.
+    """
+    WordNet(synsets_file, hypernyms_file).save_snapshot(snapshot_file)
+
+
+def load_hypernym_closure(closure_file):
+    """
+    Memory-map a hypernym closure written by WordNet.save_hypernym_closure.
+    Parameter
+    ---------
+    closure_file : string
+        The file path of the closure file.
+    Return
+    ------
+    (indptr, indices, data) : tuple
+        The CSR arrays (as memoryviews of the mapped file, nothing is read before it is accessed), see WordNet.hypernym_closure.
+    """
+    with open(closure_file, 'rb') as f_closure:
+        buffer = mmap.mmap(f_closure.fileno(), 0, access=mmap.ACCESS_READ)
+    sections = _read_sections(buffer, CLOSURE_MAGIC)
+    return sections['indptr'], sections['indices'], sections['data']
+
+
+def _score_distance(wn, index1, distances1, index2, distances2):
+    """Similarity metric 'distance': the distance between two synsets, see WordNet.distance."""
+    _, dist = wn._lowest_common(distances1, distances2)
+    return math.nan if dist is None else float(dist)
+
+
+def _score_lch(wn, index1, distances1, index2, distances2):
+    """Similarity metric 'lch': the Leacock-Chodorow distance between two synsets, see WordNet.lch_similarity."""
+    _, dist = wn._lowest_common(distances1, distances2)
+    return math.nan if dist is None else -math.log((1 + dist)/(wn.depth_wordnet()*2))
+
+
+def _score_resnik(wn, index1, distances1, index2, distances2):
+    """Similarity metric 'resnik', see WordNet.resnik_similarity."""
+    ic = wn._information_content()
+    lcs_ic = wn._common_ic(ic, distances1, distances2)
+    return math.nan if lcs_ic is None else lcs_ic
+
+
+def _score_lin(wn, index1, distances1, index2, distances2):
+    """Similarity metric 'lin', see WordNet.lin_similarity."""
+    ic = wn._information_content()
+    lcs_ic = wn._common_ic(ic, distances1, distances2)
+    return math.nan if lcs_ic is None else _lin(ic[index1], ic[index2], lcs_ic)
+
+
+def _score_jcn(wn, index1, distances1, index2, distances2):
+    """Similarity metric 'jcn', see WordNet.jcn_similarity."""
+    ic = wn._information_content()
+    lcs_ic = wn._common_ic(ic, distances1, distances2)
+    return math.nan if lcs_ic is None else _jcn(ic[index1], ic[index2], lcs_ic)
+
+
+def _lin(ic1, ic2, lcs_ic):
+    """Lin similarity from the information content of two synsets and of their most informative common hypernym."""
+    if ic1 + ic2 == 0:
+        return 1.0
+    return 2 * lcs_ic / (ic1 + ic2)
+
+
+def _jcn(ic1, ic2, lcs_ic):
+    """Jiang-Conrath similarity from the information content of two synsets and of their most informative common hypernym."""
+    distance = ic1 + ic2 - 2 * lcs_ic
+    return math.inf if distance == 0 else 1 / distance
+
+
+# name : (score function(wn, index1, distances1, index2, distances2), True if higher scores mean more similar),
+# distances1 and distances2 are the distance maps (see WordNet._ancestor_distances) of the synsets with index1 and index2
+SIMILARITY_METRICS = {
+    'distance': (_score_distance, False),
+    'lch': (_score_lch, True),
+    'resnik': (_score_resnik, True),
+    'lin': (_score_lin, True),
+    'jcn': (_score_jcn, True),
+}
+
+# state of a similarity_matrix worker process: (wn, column indexes, metric, top_k, out, distance maps of the columns)
+_similarity_state = None
+# held while the state is set in this process for forking workers
+_similarity_lock = threading.Lock()
+
+
+def _init_similarity_worker(wn, open_wordnet, state, ic=None):
+    """
+    Set up the module global state of similarity_matrix in this process, wn is opened by calling open_wordnet() if it is None
+    and given the information content table ic (if any).
+    """
+    global _similarity_state
+    if state is None:
+        _similarity_state = None
+        return
+    if wn is None:
+        wn = open_wordnet()
+        if ic is not None:
+            wn._indexes['ic'] = ic
+    _similarity_state = (wn,) + tuple(state) + (None,)
+
+
+def _similarity_columns():
+    """Returns the distance maps of all columns of similarity_matrix, they are computed on first use in each process (or before forking)."""
+    global _similarity_state
+    wn, indexes, metric, top_k, out, column_maps = _similarity_state
+    if column_maps is None:
+        column_maps = [wn._ancestor_distances(index) for index in indexes]
+        _similarity_state = (wn, indexes, metric, top_k, out, column_maps)
+    return column_maps
+
+
+def _similarity_block(start, end):
+    """Score the rows start:end of similarity_matrix in a worker process, see _score_block. The distance maps of all columns are computed once per process."""
+    _similarity_columns()
+    return _score_block(_similarity_state, start, end)
+
+
+def _score_block(state, start, end):
+    """
+    Score the rows start:end of similarity_matrix.
+    Parameter
+    ---------
+    state : tuple
+        (wn, column indexes, metric, top_k, out, distance maps of the columns).
+    Return
+    ------
+    rows : list
+        array('d') rows or top-k lists, an empty list if the rows were written to the out file.
+    """
+    wn, indexes, metric, top_k, out, column_maps = state
+    score, higher_is_better = SIMILARITY_METRICS[metric]
+
+    rows = []
+    for i in range(start, end):
+        row_map = column_maps[i]
+        row = array('d', (score(wn, indexes[i], row_map, index, column_map)
+                          for index, column_map in zip(indexes, column_maps)))
+        if top_k is None:
+            rows.append(row)
+            continue
+        candidates = ((score, j) for j, score in enumerate(row)
+                      if j != i and not math.isnan(score))
+        select = heapq.nlargest if higher_is_better else heapq.nsmallest
+        rows.append([(j, score)
+                     for score, j in select(top_k, candidates)])
+
+    if out is None:
+        return rows
+    n = len(indexes)
+    with open(out, 'r+b') as f_out:
+        with mmap.mmap(f_out.fileno(), 0) as buffer:
+            buffer[start * n * 8:end * n * 8] = b''.join(
+                row.tobytes() for row in rows)
+    return []
+
+
+def _read_synsets(synsets_file, malformed):
+    """
+    Stream the synsets file line by line.
+    A line is: id,lemmas separated by spaces,gloss. The gloss is everything after the second comma (so it can contain commas),
+    it keeps its line break like the glosses have always done.
+    Parameters
+    ----------
+    synsets_file : string
+        The file path of synset file.
+    malformed : list
+        (file path, line number) of every skipped malformed line is appended to this list.
+    Yield
+    -----
+    (line_number, id, lemmas, gloss) : tuple
+        line number, id string, list of lemma strings and gloss of a synset.
+    """
+    with open(synsets_file, 'r', encoding='utf-8') as f_synsets:
+        for line_number, line in enumerate(f_synsets, 1):
+            if not line.strip():
+                continue
+            data = line.split(',', 2)
+            if len(data) < 3 or not data[0].isdigit() or not data[1]:
+                malformed.append((synsets_file, line_number))
+                continue
+            yield line_number, data[0], data[1].split(' '), data[2]
+
+
+def _read_hypernyms(hypernyms_file, malformed):
+    """
+    Stream the hypernyms file line by line. A line is: origin id,hypernym id,hypernym id,...
+    Parameters
+    ----------
+    hypernyms_file : string
+        The file path of hypernyms file.
+    malformed : list
+        (file path, line number) of every skipped malformed line is appended to this list.
+    Yield
+    -----
+    (line_number, origin_id, hypers) : tuple
+        line number, origin id string and list of hypernym id strings.
+    """
+    with open(hypernyms_file, 'r', encoding='utf-8') as f_hypernyms:
+        for line_number, line in enumerate(f_hypernyms, 1):
+            line = line.strip()
+            if not line:
+                continue
+            data = line.split(',')
+            if not all(data):
+                malformed.append((hypernyms_file, line_number))
+                continue
+            yield line_number, data[0], data[1:]
+
+
+def _pack_strings(strings):
+    """Encode a list of strings as one utf-8 blob plus an offsets array (len(strings) + 1 entries)."""
+    blob = bytearray()
+    offsets = array('q', [0])
+    for string in strings:
+        blob += string.encode('utf-8')
+        offsets.append(len(blob))
+    return bytes(blob), offsets
+
+
+def _attach_shared_memory(name):
+    """
+    Attach to the shared memory block called name without registering it with the resource tracker: the tracker would unlink the block
+    when this process exits, while the creating process and the other workers still use it.
+    Before Python 3.13 the registration is undone with resource_tracker.unregister; a tracker shared with the creating process
+    then reports a (harmless) KeyError when the creator unlinks the block.
+    """
+    try:
+        # Python 3.13+
+        return _AttachedSharedMemory(name=name, track=False)
+    except TypeError:
+        pass
+    block = _AttachedSharedMemory(name=name)
+    if os.name == 'posix':
+        multiprocessing.resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+class _AttachedSharedMemory(multiprocessing.shared_memory.SharedMemory):
+    """
+    A shared memory block attached by WordNet.attach_shared_memory. The views of the snapshot sections may outlive it, closing it then fails:
+    the mapping is released with the last view instead.
+    """
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            pass
+
+
+def _section_table(magic, sections):
+    """
+    Lay out named arrays as a header, a section table and the 8-byte aligned section data.
+    Parameters
+    ----------
+    magic : bytes
+        8 bytes identifying the kind of file.
+    sections : list
+        A list of (name, data) tuples, data is an array.array, a memoryview or bytes,
+        or a (typecode, count) tuple for a section the caller writes itself.
+    Return
+    ------
+    (table, offsets, size) : tuple
+        The bytes of the header and the section table, the offset of every section and the total size.
+    """
+    table_end = _HEADER.size + _SECTION.size * len(sections)
+    entries = []
+    offset = table_end
+    for name, data in sections:
+        offset += -offset % 8
+        if isinstance(data, tuple):
+            typecode, count = data
+            nbytes = count * struct.calcsize(typecode)
+        else:
+            # array.array, memoryview (e.g. of another snapshot) or bytes
+            typecode = getattr(data, 'typecode', None) or getattr(data, 'format', 'B')
+            nbytes = memoryview(data).nbytes
+        entries.append((name, typecode, offset, nbytes // struct.calcsize(typecode)))
+        offset += nbytes
+
+    table = bytearray(_HEADER.pack(magic, SNAPSHOT_VERSION,
+                                   _BYTE_ORDER_MARK, len(sections)))
+    for name, typecode, section_offset, count in entries:
+        table += _SECTION.pack(name.encode('ascii'),
+                               typecode.encode('ascii'), section_offset, count)
+    return bytes(table), [entry[2] for entry in entries], offset
+
+
+def _write_sections(path, magic, sections):
+    """Write named arrays to a binary file, see _section_table for the parameters and the layout."""
+    table, offsets, _ = _section_table(magic, sections)
+    with open(path, 'wb') as f:
+        f.write(table)
+        for (_, data), offset in zip(sections, offsets):
+            f.write(bytes(offset - f.tell()))
+            f.write(data)
+
+
+def _copy_sections(buffer, magic, sections):
+    """Write named arrays into a writable buffer of at least the size given by _section_table, see _section_table for the layout."""
+    table, offsets, _ = _section_table(magic, sections)
+    buffer[:len(table)] = table
+    for (_, data), offset in zip(sections, offsets):
+        data = memoryview(data).cast('B')
+        buffer[offset:offset + len(data)] = data
+
+
+def _read_sections(buffer, magic):
+    """
+    Read the section table of a buffer written by _write_sections.
+    Return
+    ------
+    sections : dict
+        name : memoryview cast to the typecode of the section (no data is copied).
+    """
+    view = memoryview(buffer)
+    file_magic, version, mark, count = _HEADER.unpack_from(view, 0)
+    if file_magic != magic:
+        raise ValueError("Not a WordNet snapshot file.")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError("Unsupported snapshot version {}, expected {}.".format(
+            version, SNAPSHOT_VERSION))
+    if mark != _BYTE_ORDER_MARK:
+        raise ValueError("The snapshot was written on a machine with a different byte order.")
+
+    sections = dict()
+    position = _HEADER.size
+    for _ in range(count):
+        name, typecode, offset, length = _SECTION.unpack_from(view, position)
+        position += _SECTION.size
+        typecode = typecode.decode('ascii')
+        end = offset + length * struct.calcsize(typecode)
+        sections[name.rstrip(b'\x00').decode('ascii')] = view[offset:end].cast(typecode)
+    return sections
+
+
+class _LRUCache:
+    """
+    A bounded mapping dropping the least recently used entry when it is full, with hit, miss and eviction counters.
+    It can be shared by threads (e.g. the executor of AsyncWordNet).
+    """
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key):
+        """Returns the value stored for key (marking it as recently used), None if there is none."""
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def put(self, key, value):
+        """Store value for key, evicting the least recently used entry if the cache is full."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def discard_where(self, predicate):
+        """Drop the entries for which predicate(key, value) is true."""
+        with self._lock:
+            for key in [key for key, value in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self):
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'evictions': self._evictions,
+                    'size': len(self._entries), 'maxsize': self._maxsize}
+
+
+class _Profiler:
+    """
+    Call counts, latencies and work counters recorded by the wrappers installed by WordNet.enable_profiling.
+    It can be shared by threads (e.g. the executor of AsyncWordNet).
+    """
+
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, window):
+        self._window = window
+        self._lock = threading.Lock()
+        # per thread, the profiled methods being run, the first one is the method the work is attributed to
+        self._running = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # method name : [calls, seconds, deque of the latest latencies, counter name : total]
+            self._methods = dict()
+            self._counters = dict.fromkeys(_PROFILED_COUNTERS.values(), 0)
+
+    def _method(self, name):
+        method = self._methods.get(name)
+        if method is None:
+            method = self._methods[name] = [
+                0, 0.0, deque(maxlen=self._window), dict.fromkeys(_PROFILED_COUNTERS.values(), 0)]
+        return method
+
+    def record(self, name, seconds):
+        with self._lock:
+            method = self._method(name)
+            method[0] += 1
+            method[1] += seconds
+            method[2].append(seconds)
+
+    def count(self, counter, amount):
+        running = getattr(self._running, 'stack', None)
+        with self._lock:
+            self._counters[counter] += amount
+            if running:
+                self._method(running[0])[3][counter] += amount
+
+    def nested(self):
+        """Returns True if the current thread is running a profiled method."""
+        return bool(getattr(self._running, 'stack', None))
+
+    @contextlib.contextmanager
+    def running(self, name):
+        """Marks the current thread as running the profiled method name while the block is executed."""
+        stack = getattr(self._running, 'stack', None)
+        if stack is None:
+            stack = self._running.stack = []
+        stack.append(name)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def timed(self, name, method):
+        """
+        Returns a wrapper of the bound method recording its latency, the time of a generator is the time spent producing its items.
+        Only the calls made outside of any profiled method are recorded, the calls made by the methods of WordNet themselves run unwrapped
+        (their work is part of the outer call).
+        """
+        if inspect.isgeneratorfunction(method):
+            def timed_generator(generator):
+                seconds = 0.0
+                try:
+                    while True:
+                        start = time.perf_counter()
+                        try:
+                            with self.running(name):
+                                item = next(generator)
+                        except StopIteration:
+                            seconds += time.perf_counter() - start
+                            return
+                        seconds += time.perf_counter() - start
+                        yield item
+                finally:
+                    generator.close()
+                    self.record(name, seconds)
+
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                if self.nested():
+                    return method(*args, **kwargs)
+                return timed_generator(method(*args, **kwargs))
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                if self.nested():
+                    return method(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    with self.running(name):
+                        return method(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+        return wrapper
+
+    def counted(self, counter, method):
+        """Returns a wrapper of the bound method adding the size of its result (or the number of items of a generator) to counter."""
+        if inspect.isgeneratorfunction(method):
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                for item in method(*args, **kwargs):
+                    self.count(counter, 1)
+                    yield item
+        else:
+            @functools.wraps(method)
+            def wrapper(*args, **kwargs):
+                result = method(*args, **kwargs)
+                self.count(counter, len(result))
+                return result
+        return wrapper
+
+    def stats(self):
+        with self._lock:
+            methods = {name: (calls, seconds, sorted(latencies), dict(work))
+                       for name, (calls, seconds, latencies, work) in self._methods.items()}
+            counters = dict(self._counters)
+        stats = dict()
+        for name, (calls, seconds, latencies, work) in methods.items():
+            if not calls:
+                # work counted under a generator that has not finished yet
+                continue
+            stats[name] = {'calls': calls, 'seconds': seconds, 'max': latencies[-1], 'counters': work}
+            for q in self.QUANTILES:
+                stats[name]['p{:g}'.format(q * 100)] = latencies[min(
+                    len(latencies) - 1, int(q * len(latencies)))]
+        return {'methods': stats, 'counters': counters}
+
+    def prometheus(self, prefix):
+        stats = self.stats()
+        lines = ['# HELP {}_method_seconds Latency of the WordNet methods.'.format(prefix),
+                 '# TYPE {}_method_seconds summary'.format(prefix)]
+        for name, method in sorted(stats['methods'].items()):
+            for q in self.QUANTILES:
+                lines.append('{}_method_seconds{{method="{}",quantile="{:g}"}} {!r}'.format(
+                    prefix, name, q, method['p{:g}'.format(q * 100)]))
+            lines.append('{}_method_seconds_sum{{method="{}"}} {!r}'.format(
+                prefix, name, method['seconds']))
+            lines.append('{}_method_seconds_count{{method="{}"}} {}'.format(
+                prefix, name, method['calls']))
+        for counter, total in sorted(stats['counters'].items()):
+            lines.append('# TYPE {}_{}_total counter'.format(prefix, counter))
+            lines.append('{}_{}_total {}'.format(prefix, counter, total))
+            lines.append('# TYPE {}_method_{}_total counter'.format(prefix, counter))
+            for name, method in sorted(stats['methods'].items()):
+                lines.append('{}_method_{}_total{{method="{}"}} {}'.format(
+                    prefix, counter, name, method['counters'][counter]))
+        return '\n'.join(lines) + '\n'
+
+
+class _StringTable:
+    """Read-only sequence of the strings packed by _pack_strings, decoded on access."""
+
+    def __init__(self, blob, offsets):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __getitem__(self, i):
+        return str(self._blob[self._offsets[i]:self._offsets[i + 1]], 'utf-8')
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+
+class _Snapshot:
+    """The flat arrays of a WordNet snapshot, see WordNet.save_snapshot for the layout."""
+
+    def __init__(self, buffer, path=None, shared_memory=None, block=None):
+        self._buffer = buffer
+        # file path of the snapshot, None if it is not backed by a file
+        self.path = path
+        # name of the shared memory block holding buffer (see WordNet.attach_shared_memory), None if it is not backed by one
+        self.shared_memory = shared_memory
+        # the attached SharedMemory object, kept alive as long as the snapshot
+        self._block = block
+        sections = _read_sections(buffer, SNAPSHOT_MAGIC)
+        self.order = sections['order']
+        self.present = sections['present']
+        self.hyper_off = sections['hyper_off']
+        self.hyper = sections['hyper']
+        self.lemma_off = sections['lemma_off']
+        self.lemma_ids = sections['lemma_ids']
+        self.lemma_strings = _StringTable(
+            sections['lemma_str'], sections['lemma_str_off'])
+        self.posting_off = sections['posting_off']
+        self.posting = sections['posting']
+        self.glosses = _StringTable(sections['gloss'], sections['gloss_off'])
+        # lemma number : Lemma, so that every synset shares the same Lemma objects
+        self._lemmas = dict()
+
+    def index_of(self, id):
+        """Returns the index of the synset with the given id, raises KeyError if there is no such synset."""
+        try:
+            index = int(id)
+        except (TypeError, ValueError):
+            raise KeyError(id) from None
+        if str(index) != id or not 0 <= index < len(self.present) or not self.present[index]:
+            raise KeyError(id)
+        return index
+
+    def lemma(self, number):
+        """Returns the (shared) Lemma object of a lemma number."""
+        try:
+            return self._lemmas[number]
+        except KeyError:
+            lemma = self._lemmas[number] = Lemma(
+                sys.intern(self.lemma_strings[number]))
+            return lemma
+
+    def lemma_number(self, lemma):
+        """Returns the lemma number of a lemma string, or -1 if the lemma is not in the snapshot."""
+        i = bisect_left(self.lemma_strings, lemma)
+        if i < len(self.lemma_strings) and self.lemma_strings[i] == lemma:
+            return i
+        return -1
+
+
+class _SnapshotVertices(Mapping):
+    """Lazy id : Synset mapping over a snapshot, a Synset is created the first time it is accessed."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+        self._synsets = dict()
+        # id : Synset of the synsets added by WordNet.add_synset
+        self._added = dict()
+
+    def add(self, synset):
+        self._synsets[synset.id] = self._added[synset.id] = synset
+
+    def __getitem__(self, id):
+        try:
+            return self._synsets[id]
+        except KeyError:
+            pass
+        snapshot = self._snapshot
+        index = snapshot.index_of(id)
+        lemmas = [snapshot.lemma(number) for number in
+                  snapshot.lemma_ids[snapshot.lemma_off[index]:snapshot.lemma_off[index + 1]]]
+        synset = self._synsets[id] = Synset(
+            id, lemmas, snapshot.glosses[index])
+        return synset
+
+    def __contains__(self, id):
+        if id in self._added:
+            return True
+        try:
+            self._snapshot.index_of(id)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for index in self._snapshot.order:
+            yield str(index)
+        yield from self._added
+
+    def __len__(self):
+        return len(self._snapshot.order) + len(self._added)
+
+
+class _HypernymGraph:
+    """
+    The hypernym relation as CSR arrays indexed by Synset.index: the hypernym indexes of synset i are
+    targets[offsets[i]:offsets[i + 1]]. The arrays are array.array objects or memoryviews (of a snapshot).
+    """
+
+    def __init__(self, offsets, targets):
+        self.offsets = offsets
+        self.targets = targets
+
+    @classmethod
+    def from_adjacency(cls, size, adjacency):
+        """
+        Build the arrays from a dictionary index : list of hypernym indexes.
+        Parameters
+        ----------
+        size : int
+            Number of rows, the largest synset index plus one.
+        adjacency : dict
+            origin index : list of hypernym indexes.
+        """
+        offsets = array('i', [0])
+        targets = array('i')
+        for index in range(size):
+            targets.extend(adjacency.get(index, ()))
+            offsets.append(len(targets))
+        return cls(offsets, targets)
+
+    @property
+    def size(self):
+        """Number of rows, the largest synset index plus one."""
+        return len(self.offsets) - 1
+
+    def hypernyms(self, index):
+        """Returns the hypernym indexes of the synset with the given index."""
+        return self.targets[self.offsets[index]:self.offsets[index + 1]]
+
+    def is_root(self, index):
+        """True if the synset with the given index has no hypernyms."""
+        return self.offsets[index] == self.offsets[index + 1]
+
+    def _writable(self):
+        """Replace memoryviews (of a read-only snapshot) by arrays before the graph is modified."""
+        if not isinstance(self.offsets, array):
+            self.offsets = array('i', self.offsets)
+        if not isinstance(self.targets, array):
+            self.targets = array('i', self.targets)
+
+    def resize(self, size):
+        """Add empty rows until there are size rows."""
+        self._writable()
+        offsets = self.offsets
+        offsets.extend([offsets[-1]] * (size + 1 - len(offsets)))
+
+    def insert(self, index, target, keep_sorted=False):
+        """Add target to the row of index, at its end or, with keep_sorted, at its sorted position."""
+        self._writable()
+        offsets = self.offsets
+        start, end = offsets[index], offsets[index + 1]
+        self.targets.insert(bisect_left(self.targets, target, start, end) if keep_sorted else end, target)
+        offsets[index + 1:] = array('i', [offset + 1 for offset in offsets[index + 1:]])
+
+    def delete(self, index, target):
+        """Remove target from the row of index."""
+        self._writable()
+        offsets = self.offsets
+        start, end = offsets[index], offsets[index + 1]
+        for j in range(start, end):
+            if self.targets[j] == target:
+                del self.targets[j]
+                break
+        else:
+            raise ValueError((index, target))
+        offsets[index + 1:] = array('i', [offset - 1 for offset in offsets[index + 1:]])
+
+    def reverse(self):
+        """Returns the reversed relation (hyponyms) as a _HypernymGraph, rows sorted by index, built by a counting sort of the targets."""
+        offsets, targets = self.offsets, self.targets
+        size = self.size
+        reversed_offsets = array('i', bytes(4 * (size + 1)))
+        for v in targets:
+            reversed_offsets[v + 1] += 1
+        for i in range(size):
+            reversed_offsets[i + 1] += reversed_offsets[i]
+        positions = reversed_offsets[:-1]
+        reversed_targets = array('i', bytes(4 * len(targets)))
+        for u in range(size):
+            for j in range(offsets[u], offsets[u + 1]):
+                v = targets[j]
+                reversed_targets[positions[v]] = u
+                positions[v] += 1
+        return _HypernymGraph(reversed_offsets, reversed_targets)
+
+
+def _graph_checksum(graph):
+    """crc32 of the arrays of a _HypernymGraph, identifies the graph an index was computed for."""
+    return zlib.crc32(graph.targets, zlib.crc32(graph.offsets))
+
+
+class _AncestorIndex:
+    """
+    The LCA index: for every synset (indexed by Synset.index) its ancestors, itself included, sorted by index, as CSR arrays
+    ancestors[offsets[i]:offsets[i + 1]], and the bfs distance to each of them in distances_array (same positions).
+    """
+
+    def __init__(self, offsets, ancestors, distances):
+        self.offsets = offsets
+        self.ancestors = ancestors
+        self.distances_array = distances
+
+    @classmethod
+    def build(cls, graph, order):
+        """
+        Build the index in one pass over the synsets in topological order (see WordNet._topological_order):
+        the distance of a synset to an ancestor is one more than the smallest distance of its hypernyms to that ancestor.
+        """
+        offsets, targets = graph.offsets, graph.targets
+        size = graph.size
+        # rows are appended in topological order first, then copied in index order
+        starts = array('i', bytes(4 * size))
+        lengths = array('i', bytes(4 * size))
+        ancestors = array('i')
+        distances = array('i')
+        for u in order:
+            row = {u: 0}
+            for j in range(offsets[u], offsets[u + 1]):
+                p = targets[j]
+                start = starts[p]
+                end = start + lengths[p]
+                for ancestor, distance in zip(ancestors[start:end], distances[start:end]):
+                    distance += 1
+                    if row.get(ancestor, distance) >= distance:
+                        row[ancestor] = distance
+            starts[u] = len(ancestors)
+            lengths[u] = len(row)
+            keys = sorted(row)
+            ancestors.extend(keys)
+            distances.extend(row[key] for key in keys)
+
+        index_offsets = array('i', [0])
+        index_ancestors = array('i')
+        index_distances = array('i')
+        for u in range(size):
+            start = starts[u]
+            end = start + lengths[u]
+            index_ancestors.extend(ancestors[start:end])
+            index_distances.extend(distances[start:end])
+            index_offsets.append(len(index_ancestors))
+        return cls(index_offsets, index_ancestors, index_distances)
+
+    def distances(self, index):
+        """Returns the distance map of a synset: a dictionary ancestor index : distance, the synset itself included."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return dict(zip(self.ancestors[start:end], self.distances_array[start:end]))
+
+    def is_ancestor(self, ancestor, index):
+        """True if the synset with index ancestor is the synset with the given index or one of its hypernyms (binary search in its row)."""
+        start, end = self.offsets[index], self.offsets[index + 1]
+        i = bisect_left(self.ancestors, ancestor, start, end)
+        return i < end and self.ancestors[i] == ancestor
+
+    @property
+    def nbytes(self):
+        """Memory used by the arrays of the index."""
+        return sum(memoryview(data).nbytes for data in (self.offsets, self.ancestors, self.distances_array))
+
+
+class _GraphRelations(Mapping):
+    """Lazy origin id : list of relations mapping over a _HypernymGraph, only synsets with hypernyms are keys."""
+
+    def __init__(self, graph, vertices):
+        self._graph = graph
+        self._vertices = vertices
+        self._relations = dict()
+        self._len = None
+
+    def changed(self, id):
+        """Drop the relations created for id, called after the row of id in the graph changed."""
+        self._relations.pop(id, None)
+        self._len = None
+
+    def _index(self, id):
+        """Returns the index of the synset with the given id if it has hypernyms, raises KeyError otherwise."""
+        if id not in self._vertices:
+            raise KeyError(id)
+        index = int(id)
+        if index >= self._graph.size or self._graph.is_root(index):
+            raise KeyError(id)
+        return index
+
+    def __getitem__(self, id):
+        try:
+            return self._relations[id]
+        except KeyError:
+            pass
+        index = self._index(id)
+        origin = self._vertices[id]
+        relations = self._relations[id] = [Relation(origin, self._vertices[str(destination)])
+                                           for destination in self._graph.hypernyms(index)]
+        return relations
+
+    def __contains__(self, id):
+        try:
+            self._index(id)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        graph = self._graph
+        for id in self._vertices:
+            index = int(id)
+            if index < graph.size and not graph.is_root(index):
+                yield id
+
+    def __len__(self):
+        if self._len is None:
+            self._len = sum(1 for _ in self)
+        return self._len
+
+
+class _SnapshotLemmas(Mapping):
+    """Lazy Lemma : list of synsets mapping over the sorted lemma table of a snapshot."""
+
+    def __init__(self, snapshot, vertices):
+        self._snapshot = snapshot
+        self._vertices = vertices
+        self._synsets = dict()
+        # Lemma : list of synsets of the lemmas which are not in the snapshot, added by WordNet.add_synset
+        self._added = dict()
+        # True once a synset was added, the posting lists of the snapshot are then incomplete
+        self.modified = False
+
+    def add(self, lemma, synset):
+        self.modified = True
+        if lemma in self:
+            self[lemma].append(synset)
+        else:
+            self._synsets[lemma] = self._added[lemma] = [synset]
+
+    def __getitem__(self, lemma):
+        try:
+            return self._synsets[lemma]
+        except KeyError:
+            pass
+        snapshot = self._snapshot
+        number = snapshot.lemma_number(lemma.lemma) if isinstance(
+            lemma, Lemma) else -1
+        if number < 0:
+            raise KeyError(lemma)
+        start, end = snapshot.posting_off[number], snapshot.posting_off[number + 1]
+        synsets = self._synsets[lemma] = [self._vertices[str(index)]
+                                          for index in snapshot.posting[start:end]]
+        return synsets
+
+    def __contains__(self, lemma):
+        return lemma in self._added or isinstance(lemma, Lemma) and self._snapshot.lemma_number(lemma.lemma) >= 0
+
+    def __iter__(self):
+        for number in range(len(self._snapshot.lemma_strings)):
+            yield self._snapshot.lemma(number)
+        yield from self._added
+
+    def __len__(self):
+        return len(self._snapshot.lemma_strings) + len(self._added)
+
+
+def _normalize_lemma(lemma):
+    """Normalized form of a lemma used by _LemmaIndex: case folded, spaces replaced by underscores."""
+    return lemma.casefold().replace(' ', '_')
+
+
+class _LemmaIndex:
+    """
+    Sorted array of normalized lemmas (see _normalize_lemma) with the lemmas of every normalized form.
+    Exact lookups and prefix enumeration are binary searches, fuzzy search walks the sorted array as an implicit trie.
+    """
+
+    def __init__(self, lemmas):
+        forms = dict()
+        for lemma in lemmas:
+            forms.setdefault(_normalize_lemma(lemma), []).append(lemma)
+        self.keys = sorted(forms)
+        self.forms = [tuple(sorted(forms[key])) for key in self.keys]
+
+    def lemmas(self, word):
+        """Returns the lemmas with the normalized form of word."""
+        key = _normalize_lemma(word)
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return self.forms[i]
+        return ()
+
+    def complete(self, prefix, limit=None):
+        keys, forms = self.keys, self.forms
+        prefix = _normalize_lemma(prefix)
+        completions = []
+        for i in range(bisect_left(keys, prefix), len(keys)):
+            if not keys[i].startswith(prefix):
+                break
+            completions.extend(forms[i])
+            if limit is not None and len(completions) >= limit:
+                return completions[:limit]
+        return completions
+
+    def suggest(self, word, max_distance, limit=None):
+        """
+        Levenshtein search: consecutive keys share their common prefix, so the dynamic programming rows of that prefix are kept (rows[i] is the row after
+        the first i characters of the key), and all keys below a prefix whose row exceeds max_distance everywhere are skipped with one binary search.
+        """
+        keys, forms = self.keys, self.forms
+        word = _normalize_lemma(word)
+        rows = [list(range(len(word) + 1))]
+        # key (or pruned prefix) the rows were computed for
+        previous = ''
+        found = []
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+            common = 0
+            end = min(len(key), len(previous))
+            while common < end and key[common] == previous[common]:
+                common += 1
+            del rows[common + 1:]
+
+            for depth in range(common, len(key)):
+                row = rows[-1]
+                character = key[depth]
+                next_row = [row[0] + 1]
+                for j in range(1, len(row)):
+                    next_row.append(min(row[j] + 1, next_row[j - 1] + 1,
+                                        row[j - 1] + (word[j - 1] != character)))
+                rows.append(next_row)
+                if min(next_row) > max_distance:
+                    # no key starting with this prefix is close enough
+                    previous = key[:depth + 1]
+                    i = bisect_left(keys, previous + '\U0010ffff', i)
+                    break
+            else:
+                distance = rows[-1][-1]
+                if distance <= max_distance:
+                    found.append((distance, i))
+                previous = key
+                i += 1
+
+        found.sort()
+        suggestions = [(lemma, distance)
+                       for distance, i in found for lemma in forms[i]]
+        return suggestions if limit is None else suggestions[:limit]
+
+
 """main method used to visualize print result of __str__ of all classes"""
 """
 def main():
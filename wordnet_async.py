@@ -0,0 +1,108 @@
+"""
+An asyncio facade over the WordNet class: awaitable queries for services running an event loop.
+Heavy queries run in a bounded thread pool, identical queries in flight are coalesced and every query can have a timeout.
+"""
+
+import asyncio
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class AsyncWordNet:
+    """Awaitable versions of the WordNet queries"""
+
+    def __init__(self, wn, max_workers=4, timeout=None, executor=None):
+        """
+        Constructor for the AsyncWordNet class.
+        Parameters
+        ----------
+        wn : WordNet
+            The WordNet object answering the queries.
+        max_workers : int
+            Number of threads running heavy queries, ignored if executor is given.
+        timeout : float
+            Default timeout of every query in seconds, None for no timeout.
+        executor : concurrent.futures.Executor
+            Executor running heavy queries instead of an own thread pool. It is not shut down by close.
+        """
+        self._wn = wn
+        self._timeout = timeout
+        self._own_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='wordnet')
+        # (method name, arguments) : future of the query in flight
+        self._inflight = dict()
+
+    @property
+    def wordnet(self):
+        return self._wn
+
+    async def _run(self, name, *args, timeout=None):
+        """
+        A private helper running the WordNet method name in the executor. A query identical to one in flight waits for the same result.
+        Raises asyncio.TimeoutError after timeout seconds (the default timeout if None); the query itself keeps running for other waiters.
+        """
+        key = (name, args)
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(
+                self._executor, functools.partial(getattr(self._wn, name), *args))
+            self._inflight[key] = future
+            future.add_done_callback(
+                lambda _: self._inflight.pop(key, None))
+        if timeout is None:
+            timeout = self._timeout
+        result = await asyncio.wait_for(asyncio.shield(future), timeout)
+        # coalesced callers must not share mutable results
+        return copy.copy(result)
+
+    async def get_synsets(self, noun):
+        """Awaitable WordNet.get_synsets, a single dictionary lookup which runs directly on the event loop."""
+        return self._wn.get_synsets(noun)
+
+    async def bfs(self, synset, timeout=None):
+        """Awaitable WordNet.bfs."""
+        return await self._run('bfs', synset, timeout=timeout)
+
+    async def paths_to_root(self, synset, timeout=None):
+        """Awaitable WordNet.paths_to_root."""
+        return await self._run('paths_to_root', synset, timeout=timeout)
+
+    async def lowest_common_hypernyms(self, synset1, synset2, timeout=None):
+        """Awaitable WordNet.lowest_common_hypernyms."""
+        return await self._run('lowest_common_hypernyms', synset1, synset2, timeout=timeout)
+
+    async def distance(self, synset1, synset2, timeout=None):
+        """Awaitable WordNet.distance."""
+        return await self._run('distance', synset1, synset2, timeout=timeout)
+
+    async def depth_wordnet(self, timeout=None):
+        """Awaitable WordNet.depth_wordnet."""
+        return await self._run('depth_wordnet', timeout=timeout)
+
+    async def lch_similarity(self, synset1, synset2, timeout=None):
+        """Awaitable WordNet.lch_similarity."""
+        return await self._run('lch_similarity', synset1, synset2, timeout=timeout)
+
+    async def noun_lowest_common_hypernyms(self, noun1, noun2, timeout=None):
+        """Awaitable WordNet.noun_lowest_common_hypernyms."""
+        return await self._run('noun_lowest_common_hypernyms', noun1, noun2, timeout=timeout)
+
+    def close(self):
+        """Shut down the own thread pool, waiting for running queries. It blocks the calling thread, see aclose on the event loop."""
+        if self._own_executor:
+            self._executor.shutdown(wait=True)
+
+    async def aclose(self):
+        """Awaitable close: the running queries are waited for in another thread, the event loop keeps running meanwhile."""
+        if self._own_executor:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, functools.partial(self._executor.shutdown, wait=True))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()